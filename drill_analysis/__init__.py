@@ -0,0 +1,9 @@
+"""
+Football drill video analysis: keypoint and object extraction (extraction), temporal
+alignment (alignment), movement analysis (movement) and feedback (feedback).
+
+Importing the package does no work and loads no vision or plotting libraries; MediaPipe,
+YOLO, OpenCV and matplotlib are imported only by the steps that use them.
+"""
+
+__version__ = '0.1.0'
@@ -0,0 +1,449 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .alignment_path import AlignmentPath
+from .plotting import save_line_plot
+
+def load_json_data(json_path):
+    with open(json_path, 'r') as f:
+        return json.load(f)
+
+def check_single_person(frame_data):
+    """
+    Raise a ValueError pointing at --split-players if frame_data is multi-person step_1 output
+    (records keyed by 'players'), which the later steps cannot use directly.
+    """
+    if frame_data and 'player_keypoints' not in frame_data[0] and 'players' in frame_data[0]:
+        raise ValueError("Multi-person extraction output has per-track 'players' instead of 'player_keypoints'; "
+                         "use the per-player <output>_player<ID>.json files written by extract --multi-person "
+                         "(or extraction.save_player_sequences())")
+
+def extract_keypoint_sequences(json_data, keypoint_ids):
+    """
+    Extract sequences of (x, y, z) for specified keypoints across frames.
+    keypoint_ids: List of MediaPipe landmark IDs (e.g., 23=left_hip, 25=left_knee, 27=left_ankle).
+    Returns: np.array of shape (num_frames, len(keypoint_ids) * 3).
+    """
+    check_single_person(json_data)
+    sequences = []
+    for frame in json_data:
+        keypoints = frame['player_keypoints']
+        frame_data = []
+        for kid in keypoint_ids:
+            if str(kid) in keypoints:
+                kp = keypoints[str(kid)]
+                frame_data.extend([kp['x'], kp['y'], kp['z']])
+            else:
+                frame_data.extend([0.0, 0.0, 0.0])  # Handle missing keypoints
+        sequences.append(frame_data)
+    return np.array(sequences)
+
+def align_sequences(baseline_seq, player_seq):
+    """
+    Perform DTW alignment between two sequences.
+    Returns alignment indices (baseline_idx, player_idx) and distance.
+    """
+    # Euclidean distance metric; the named metric is computed natively instead of
+    # calling a Python function for every frame pair
+    from dtw import dtw
+    alignment = dtw(baseline_seq, player_seq, dist_method='euclidean')
+    
+    # Extract aligned frame indices
+    aligned_indices = list(zip(alignment.index1, alignment.index2))
+    return aligned_indices, alignment.distance
+
+def hip_centroid_speed(seq, smooth_window=5):
+    """
+    Per-frame speed of the hip centroid, smoothed with a moving average.
+    seq: Sequence from extract_keypoint_sequences whose first two keypoints are the hips (23, 24).
+    Returns: np.array of shape (num_frames,).
+    """
+    centroid = (seq[:, 0:2] + seq[:, 3:5]) / 2.0
+    speed = np.zeros(len(seq))
+    if len(seq) > 1:
+        speed[1:] = np.linalg.norm(np.diff(centroid, axis=0), axis=1)
+    if smooth_window > 1 and len(seq) >= smooth_window:
+        kernel = np.ones(smooth_window) / smooth_window
+        speed = np.convolve(speed, kernel, mode='same')
+    return speed
+
+def find_phase_boundaries(seq, num_phases, min_phase_len=15):
+    """
+    Split a sequence into drill phases at hip-centroid velocity minima.
+    In a cone drill the player slows down at every cone turn, so the slowest frames
+    are the cheapest proxy for cone visits and direction changes.
+    Returns: Sorted list of boundary frame indices (at most num_phases - 1 of them).
+    """
+    speed = hip_centroid_speed(seq)
+    n = len(speed)
+    if num_phases <= 1 or n < 3:
+        return []
+    # Local minima in the interior, slowest first
+    interior = np.arange(1, n - 1)
+    is_min = (speed[1:-1] <= speed[:-2]) & (speed[1:-1] <= speed[2:])
+    candidates = interior[is_min]
+    candidates = candidates[np.argsort(speed[candidates], kind='stable')]
+
+    boundaries = []
+    for idx in candidates:
+        if idx < min_phase_len or n - idx < min_phase_len:
+            continue
+        if all(abs(idx - b) >= min_phase_len for b in boundaries):
+            boundaries.append(int(idx))
+            if len(boundaries) == num_phases - 1:
+                break
+    return sorted(boundaries)
+
+def coarse_alignment(baseline_seq, player_seq, max_frames=300):
+    """
+    Cheap DTW on block-averaged sequences of at most max_frames frames, used to put the
+    two sessions in rough correspondence before phase cuts are matched.
+    Returns: (step, coarse aligned indices); coarse index i covers frames [i * step, (i + 1) * step).
+    """
+    step = max(1, -(-max(len(baseline_seq), len(player_seq)) // max_frames))
+
+    def decimate(seq):
+        # Block means rather than every step-th frame, so keypoint noise does not alias
+        n = len(seq) // step * step
+        blocks = seq[:n].reshape(-1, step, seq.shape[1]).mean(axis=1) if n else seq[:0]
+        return np.vstack([blocks, seq[n:].mean(axis=0, keepdims=True)]) if n < len(seq) else blocks
+
+    indices, _ = align_sequences(decimate(baseline_seq), decimate(player_seq))
+    return step, indices
+
+def match_phase_cuts(baseline_seq, player_seq, baseline_cuts, min_phase_len=15):
+    """
+    Map baseline phase cuts into the player timeline: each cut goes through a coarse DTW
+    (see coarse_alignment) and is then snapped to the slowest player frame nearby, since
+    the player also slows down at the matching cone turn.
+    Cuts that cannot be placed monotonically at least min_phase_len frames apart are dropped.
+    Returns: (baseline_cuts, player_cuts) of equal length, in corresponding order.
+    """
+    if not baseline_cuts:
+        return [], []
+    step, coarse = coarse_alignment(baseline_seq, player_seq)
+    coarse = np.asarray(coarse)
+    speed = hip_centroid_speed(player_seq)
+    n = len(player_seq)
+    radius = max(2 * step, min_phase_len)
+
+    matched_baseline, matched_player = [], []
+    for cut in baseline_cuts:
+        paired = coarse[coarse[:, 0] == cut // step, 1]
+        centre = int(round((paired.mean() + 0.5) * step)) if len(paired) else cut * n // len(baseline_seq)
+        previous = matched_player[-1] if matched_player else 0
+        lo = max(centre - radius, previous + min_phase_len, min_phase_len)
+        hi = min(centre + radius + 1, n - min_phase_len)
+        if lo >= hi:
+            continue
+        matched_baseline.append(cut)
+        matched_player.append(int(lo + np.argmin(speed[lo:hi])))
+    return matched_baseline, matched_player
+
+def _to_bounds(cuts, n):
+    edges = [0] + list(cuts) + [n]
+    return [(edges[i], edges[i + 1]) for i in range(len(edges) - 1)]
+
+def segment_phases(baseline_seq, player_seq, frames_per_phase=150, min_phase_len=15, max_length_ratio=2.5):
+    """
+    Segment both sequences into the same number of corresponding drill phases.
+    Phases are cut at baseline velocity minima, and each cut is mapped to its counterpart in
+    the player session (see match_phase_cuts), so phase k is the same drill segment on both sides.
+    Phase pairs whose lengths differ by more than max_length_ratio are implausible matches; the
+    cut ending such a phase is dropped, merging it with its neighbour, until none is left (with
+    no cuts left this is plain global DTW).
+    Returns: (baseline_bounds, player_bounds) as lists of (start, end) frame ranges.
+    """
+    num_phases = max(1, min(len(baseline_seq), len(player_seq)) // frames_per_phase)
+    baseline_cuts = find_phase_boundaries(baseline_seq, num_phases, min_phase_len)
+    baseline_cuts, player_cuts = match_phase_cuts(baseline_seq, player_seq, baseline_cuts, min_phase_len)
+
+    dropped = 0
+    while baseline_cuts:
+        baseline_bounds = _to_bounds(baseline_cuts, len(baseline_seq))
+        player_bounds = _to_bounds(player_cuts, len(player_seq))
+        ratios = [max(b_end - b_start, p_end - p_start) / max(min(b_end - b_start, p_end - p_start), 1)
+                  for (b_start, b_end), (p_start, p_end) in zip(baseline_bounds, player_bounds)]
+        worst = int(np.argmax(ratios))
+        if ratios[worst] <= max_length_ratio:
+            break
+        cut = min(worst, len(baseline_cuts) - 1)  # cut ending the phase (the last phase has none after it)
+        del baseline_cuts[cut], player_cuts[cut]
+        dropped += 1
+    if dropped:
+        print(f"Merged {dropped} phase pair(s) with implausible length ratios (> {max_length_ratio})")
+
+    return _to_bounds(baseline_cuts, len(baseline_seq)), _to_bounds(player_cuts, len(player_seq))
+
+def align_sequences_phased(baseline_seq, player_seq, frames_per_phase=150, max_workers=None):
+    """
+    Align corresponding drill phases independently and in parallel, then stitch the paths.
+    Each phase path starts at the phase origin and ends at its last frame pair, so the
+    stitched path stays monotone and continuous across phase boundaries.
+    Returns: (aligned_indices, dtw_distance, phases) where phases lists the (baseline, player) bounds.
+    The distance is the symmetric2 cost of the stitched path (path_distance), so it is on the same
+    scale as a global DTW distance; summing the phase distances would under-weight boundary steps.
+    """
+    baseline_bounds, player_bounds = segment_phases(baseline_seq, player_seq, frames_per_phase)
+    phases = list(zip(baseline_bounds, player_bounds))
+
+    def align_phase(phase):
+        (b_start, b_end), (p_start, p_end) = phase
+        indices, _ = align_sequences(baseline_seq[b_start:b_end], player_seq[p_start:p_end])
+        return [(b + b_start, p + p_start) for b, p in indices]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(align_phase, phases))
+
+    aligned_indices = [pair for indices in results for pair in indices]
+    return aligned_indices, path_distance(baseline_seq, player_seq, aligned_indices), phases
+
+def compare_alignment_modes(baseline_seq, player_seq, frames_per_phase=150):
+    """
+    Run the global and phase-segmented alignments on the same sequences and report cost and speed.
+    Returns: Dict {'global': {...}, 'phased': {...}} with DTW distance, runtime and path length.
+    """
+    start = time.perf_counter()
+    global_indices, global_distance = align_sequences(baseline_seq, player_seq)
+    global_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    phased_indices, phased_distance, phases = align_sequences_phased(baseline_seq, player_seq, frames_per_phase)
+    phased_time = time.perf_counter() - start
+
+    report = {
+        'global': {'dtw_distance': float(global_distance), 'seconds': global_time, 'path_length': len(global_indices)},
+        'phased': {'dtw_distance': float(phased_distance), 'seconds': phased_time, 'path_length': len(phased_indices),
+                   'num_phases': len(phases)}
+    }
+    print(f"Global DTW: distance {global_distance:.2f}, {global_time:.3f}s")
+    print(f"Phased DTW ({len(phases)} phases): distance {phased_distance:.2f}, {phased_time:.3f}s")
+    if phased_time > 0:
+        print(f"Phased speed-up: {global_time / phased_time:.2f}x, "
+              f"cost change: {phased_distance - global_distance:+.2f}")
+    return report
+
+def motion_energy(seq, smooth_window=5):
+    """
+    Per-frame keypoint displacement from the previous frame (0 for the first frame), measured on
+    a moving average of the keypoints so landmark jitter does not read as motion.
+    """
+    energy = np.zeros(len(seq))
+    if len(seq) > 1:
+        if smooth_window > 1 and len(seq) >= smooth_window:
+            kernel = np.ones(smooth_window) / smooth_window
+            seq = np.stack([np.convolve(seq[:, d], kernel, mode='same') for d in range(seq.shape[1])], axis=1)
+        energy[1:] = np.linalg.norm(np.diff(seq, axis=0), axis=1)
+    return energy
+
+def still_frames(energy):
+    """Frames where the player is barely moving (under a quarter of the median motion energy)."""
+    return energy < 0.25 * np.median(energy[1:]) if len(energy) > 1 else np.zeros(len(energy), dtype=bool)
+
+def still_runs(still, min_length=1):
+    """
+    Stretches of consecutive still frames lasting at least min_length frames.
+    Returns: Array of shape (num_runs, 2) with the first and last frame of each run.
+    """
+    padded = np.concatenate(([0], still.astype(np.int8), [0]))
+    change = np.flatnonzero(np.diff(padded))
+    runs = np.stack([change[::2], change[1::2] - 1], axis=1)
+    return runs[runs[:, 1] - runs[:, 0] + 1 >= min_length]
+
+def _energy_keys(cumulative, num_keys):
+    n = len(cumulative)
+    targets = np.linspace(0, cumulative[-1], max(2, num_keys))
+    return np.concatenate(([0], np.minimum(np.searchsorted(cumulative, targets), n - 1), [n - 1]))
+
+def _fill_gaps(keys, max_gap):
+    gaps = np.flatnonzero(np.diff(keys) > max_gap)
+    if len(gaps):
+        fill = [np.arange(keys[g] + max_gap, keys[g + 1], max_gap) for g in gaps]
+        keys = np.unique(np.concatenate([keys] + fill))
+    return keys
+
+def select_key_frames(seq, ratio=4.0, max_gap=None):
+    """
+    Pick key frames by motion energy: frames are placed at equal increments of the cumulative
+    frame-to-frame keypoint displacement, so fast movement keeps dense sampling while stretches
+    where the player barely moves collapse to a few frames. Still stretches of at least ratio
+    frames also keep their first and last frame, so move/stop transitions are not interpolated away.
+    ratio: Target reduction; the result has about len(seq) / ratio key frames.
+    max_gap: Longest allowed gap between key frames (default 8 * ratio), so still phases keep anchors.
+    Returns: Sorted np.array of key frame indices, always including the first and last frame.
+    """
+    n = len(seq)
+    if n <= 2 or ratio <= 1:
+        return np.arange(n)
+    energy = motion_energy(seq)
+    cumulative = np.cumsum(energy)
+    budget = max(2, int(np.ceil(n / ratio)))
+    max_gap = max_gap or int(8 * ratio)
+
+    # Transition anchors take at most half the budget, longest still stretches first
+    runs = still_runs(still_frames(energy), min_length=int(np.ceil(ratio)))
+    if len(runs) > budget // 4:
+        longest = np.argsort(runs[:, 0] - runs[:, 1], kind='stable')[:budget // 4]
+        runs = runs[np.sort(longest)]
+    anchors = runs.ravel()
+
+    # Energy-spaced keys get the rest; shrink them once if anchors and gap filling overshoot
+    num_energy = budget - len(anchors)
+    keys = _fill_gaps(np.unique(np.concatenate((_energy_keys(cumulative, num_energy), anchors))), max_gap)
+    if len(keys) > budget:
+        num_energy -= len(keys) - budget
+        keys = _fill_gaps(np.unique(np.concatenate((_energy_keys(cumulative, num_energy), anchors))), max_gap)
+    return keys
+
+def expand_path(reduced_indices, baseline_keys, player_keys):
+    """
+    Map a path over key frames back to original frame indices, filling the frames between
+    consecutive key pairs by linear interpolation so the result is a dense, monotone path
+    with unit steps (a valid full-rate warping path).
+    Returns: List of (baseline_frame, player_frame).
+    """
+    reduced = np.asarray(reduced_indices, dtype=np.int64).reshape(-1, 2)
+    mapped = np.stack([baseline_keys[reduced[:, 0]], player_keys[reduced[:, 1]]], axis=1)
+    if len(mapped) < 2:
+        return [tuple(pair) for pair in mapped.tolist()]
+    delta = np.diff(mapped, axis=0)
+    steps = delta.max(axis=1)
+    segment = np.repeat(np.arange(len(delta)), steps)
+    t = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps) + 1
+    frac = t / steps[segment]
+    filled = mapped[segment] + np.floor(frac[:, None] * delta[segment] + 0.5).astype(np.int64)
+    path = np.concatenate([mapped[:1], filled])
+    return [tuple(pair) for pair in path.tolist()]
+
+def path_distance(baseline_seq, player_seq, aligned_indices):
+    """
+    DTW distance of a given warping path under the symmetric2 step pattern used by dtw()
+    (diagonal steps count twice), so costs of expanded and full-rate paths are comparable.
+    """
+    pairs = np.asarray(aligned_indices, dtype=np.int64).reshape(-1, 2)
+    local = np.linalg.norm(baseline_seq[pairs[:, 0]] - player_seq[pairs[:, 1]], axis=1)
+    weights = np.ones(len(pairs))
+    if len(pairs) > 1:
+        diagonal = np.all(np.diff(pairs, axis=0) == 1, axis=1)
+        weights[1:] = np.where(diagonal, 2.0, 1.0)
+    return float(np.sum(weights * local))
+
+def align_sequences_subsampled(baseline_seq, player_seq, ratio=4.0, mode='global', frames_per_phase=150):
+    """
+    Align only the motion-energy key frames of both sequences and map the path back to
+    original frame indices. DTW cost falls roughly with the square of the reduction ratio.
+    Returns: (aligned_indices, dtw_distance, phases, (baseline_keys, player_keys)); the distance is
+    recomputed on the expanded full-rate path, and phases (phased mode) are in original frames.
+    """
+    baseline_keys = select_key_frames(baseline_seq, ratio)
+    player_keys = select_key_frames(player_seq, ratio)
+    reduced_baseline = baseline_seq[baseline_keys]
+    reduced_player = player_seq[player_keys]
+
+    phases = None
+    if mode == 'phased':
+        reduced_per_phase = max(1, int(frames_per_phase * len(reduced_player) / len(player_seq)))
+        reduced_indices, _, reduced_phases = align_sequences_phased(reduced_baseline, reduced_player, reduced_per_phase)
+
+        def to_frames(keys, start, end, n):
+            return int(keys[start]), int(keys[end]) if end < len(keys) else n
+
+        phases = [(to_frames(baseline_keys, *b, len(baseline_seq)), to_frames(player_keys, *p, len(player_seq)))
+                  for b, p in reduced_phases]
+    else:
+        reduced_indices, _ = align_sequences(reduced_baseline, reduced_player)
+
+    aligned_indices = expand_path(reduced_indices, baseline_keys, player_keys)
+    dtw_distance = path_distance(baseline_seq, player_seq, aligned_indices)
+    return aligned_indices, dtw_distance, phases, (baseline_keys, player_keys)
+
+def compare_subsampling(baseline_seq, player_seq, ratio=4.0):
+    """
+    Report speed and quality loss of key-frame alignment against full-rate DTW: runtime,
+    path distance on the full-rate sequences, and the mean/max deviation (in baseline frames)
+    of the mapped baseline position for every player frame, and separately for frames where the
+    player is moving (inside still stretches any mapping is about equally cheap, so deviation there
+    says little about alignment quality).
+    Returns: Dict with the measurements.
+    """
+    start = time.perf_counter()
+    full_indices, _ = align_sequences(baseline_seq, player_seq)
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sub_indices, sub_distance, _, (baseline_keys, player_keys) = align_sequences_subsampled(baseline_seq, player_seq, ratio)
+    sub_time = time.perf_counter() - start
+
+    full_path = AlignmentPath.from_pairs(full_indices)
+    sub_path = AlignmentPath.from_pairs(sub_indices)
+    player_frames = np.arange(len(player_seq))
+    deviation = np.abs(full_path.player_to_baseline_interp(player_frames) - sub_path.player_to_baseline_interp(player_frames))
+    full_distance = path_distance(baseline_seq, player_seq, full_indices)
+    moving = ~still_frames(motion_energy(player_seq))
+
+    report = {
+        'reduction': (len(baseline_seq) * len(player_seq)) / max(len(baseline_keys) * len(player_keys), 1),
+        'full_seconds': full_time,
+        'subsampled_seconds': sub_time,
+        'full_distance': full_distance,
+        'subsampled_distance': sub_distance,
+        'distance_increase_pct': 100.0 * (sub_distance - full_distance) / full_distance if full_distance > 0 else 0.0,
+        'mean_frame_deviation': float(deviation.mean()) if len(deviation) else 0.0,
+        'max_frame_deviation': float(deviation.max()) if len(deviation) else 0.0,
+        'moving_frame_deviation': float(deviation[moving].mean()) if moving.any() else 0.0
+    }
+    print(f"Key frames: {len(baseline_keys)}/{len(baseline_seq)} baseline, {len(player_keys)}/{len(player_seq)} player "
+          f"({report['reduction']:.1f}x fewer cost-matrix cells)")
+    print(f"Full-rate DTW: {full_time:.3f}s, distance {full_distance:.2f}")
+    print(f"Subsampled DTW: {sub_time:.3f}s, distance {sub_distance:.2f} ({report['distance_increase_pct']:+.1f}%)")
+    print(f"Path deviation: mean {report['mean_frame_deviation']:.2f}, max {report['max_frame_deviation']:.1f} baseline frames "
+          f"({report['moving_frame_deviation']:.2f} while moving)")
+    return report
+
+def main(baseline_json, player_json, output_path, mode='global', frames_per_phase=150, subsample_ratio=None,
+         plot_path='alignment_path.png'):
+    """
+    mode: 'global' aligns the whole sessions in one DTW; 'phased' segments both sessions into
+    drill phases and aligns corresponding phases independently (see align_sequences_phased).
+    subsample_ratio: If set (e.g. 4), align only motion-energy key frames and map the path back to
+    full-rate frame indices (see align_sequences_subsampled).
+    plot_path: Where to save the alignment path plot (None skips plotting).
+    """
+    # Load JSON data
+    baseline_data = load_json_data(baseline_json)
+    player_data = load_json_data(player_json)
+
+    # Select keypoints for alignment (focus on lower body for football drills)
+    keypoint_ids = [23, 24, 25, 26, 27, 28]  # left_hip, right_hip, left_knee, right_knee, left_ankle, right_ankle
+
+    # Extract sequences
+    baseline_seq = extract_keypoint_sequences(baseline_data, keypoint_ids)
+    player_seq = extract_keypoint_sequences(player_data, keypoint_ids)
+
+    # Perform DTW alignment
+    phases = None
+    if mode not in ('global', 'phased'):
+        raise ValueError(f"Unknown alignment mode: {mode}")
+    if subsample_ratio:
+        aligned_indices, dtw_distance, phases, (baseline_keys, player_keys) = align_sequences_subsampled(
+            baseline_seq, player_seq, subsample_ratio, mode, frames_per_phase)
+        print(f"Aligned {len(baseline_keys)} baseline and {len(player_keys)} player key frames")
+    elif mode == 'phased':
+        aligned_indices, dtw_distance, phases = align_sequences_phased(baseline_seq, player_seq, frames_per_phase)
+    else:
+        aligned_indices, dtw_distance = align_sequences(baseline_seq, player_seq)
+
+    # Save alignment results as a run-length encoded path (see alignment_path.AlignmentPath)
+    alignment = AlignmentPath.from_pairs(aligned_indices, dtw_distance, mode, phases)
+    alignment.save(output_path)
+
+    print(f"Alignment saved to {output_path} ({len(alignment)} frame pairs in {alignment.num_runs} runs)")
+    print(f"DTW Distance: {dtw_distance}")
+
+    # Optional: Visualize alignment path
+    if not plot_path:
+        return
+    save_line_plot(plot_path, [([b for b, _ in aligned_indices], [p for _, p in aligned_indices], {'color': 'blue'})],
+                   'Baseline Frame', 'Player Frame', 'DTW Alignment Path')
+    print(f"Alignment path visualization saved to {plot_path}")
@@ -0,0 +1,179 @@
+import json
+import numpy as np
+
+class AlignmentPath:
+    """
+    Run-length encoded DTW warping path.
+
+    A DTW path only ever steps by (1, 0), (0, 1) or (1, 1), so it is stored as runs of a
+    constant step: run k covers the frame pairs
+    (baseline_start[k] + j * baseline_step[k], player_start[k] + j * player_step[k])
+    for j in 0..length[k]-1. Runs are ordered along the path, so both start columns are
+    sorted and frame lookups are binary searches over the runs.
+    """
+
+    def __init__(self, baseline_start, player_start, baseline_step, player_step, length,
+                 dtw_distance=0.0, alignment_mode='global', phases=None):
+        self.baseline_start = np.asarray(baseline_start, dtype=np.int64)
+        self.player_start = np.asarray(player_start, dtype=np.int64)
+        self.baseline_step = np.asarray(baseline_step, dtype=np.int64)
+        self.player_step = np.asarray(player_step, dtype=np.int64)
+        self.length = np.asarray(length, dtype=np.int64)
+        self.dtw_distance = float(dtw_distance)
+        self.alignment_mode = alignment_mode
+        self.phases = phases
+        self.baseline_end = self.baseline_start + (self.length - 1) * self.baseline_step
+        self.player_end = self.player_start + (self.length - 1) * self.player_step
+
+    @classmethod
+    def from_pairs(cls, pairs, dtw_distance=0.0, alignment_mode='global', phases=None):
+        """
+        Build the run-length encoding from (baseline_frame, player_frame) pairs in path order.
+        """
+        pts = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        if len(pts) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return cls(empty, empty, empty, empty, empty, dtw_distance, alignment_mode, phases)
+        if len(pts) == 1:
+            return cls(pts[:1, 0], pts[:1, 1], [0], [0], [1], dtw_distance, alignment_mode, phases)
+
+        steps = np.diff(pts, axis=0)
+        if np.any(steps < 0) or np.any(steps > 1):
+            raise ValueError("Alignment path must be monotone with unit steps")
+        # Group consecutive equal steps; group g spans steps [group_start[g], group_end[g])
+        codes = steps[:, 0] * 2 + steps[:, 1]
+        group_start = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+        group_end = np.append(group_start[1:], len(codes))
+        # The first run also owns point 0; every later run starts one point after its group
+        point_start = group_start + 1
+        point_start[0] = 0
+        length = group_end - group_start
+        length[0] += 1
+        return cls(pts[point_start, 0], pts[point_start, 1],
+                   steps[group_start, 0], steps[group_start, 1], length,
+                   dtw_distance, alignment_mode, phases)
+
+    @classmethod
+    def from_json(cls, alignment_data):
+        """Build from the legacy alignment_data.json layout ({'aligned_frames': [...], 'dtw_distance': ...})."""
+        pairs = [(pair['baseline_frame'], pair['player_frame']) for pair in alignment_data['aligned_frames']]
+        phases = alignment_data.get('phases')
+        if phases is not None:
+            phases = [(tuple(phase['baseline']), tuple(phase['player'])) for phase in phases]
+        return cls.from_pairs(pairs, alignment_data.get('dtw_distance', 0.0),
+                              alignment_data.get('alignment_mode', 'global'), phases)
+
+    def save(self, path):
+        """Save as a compressed .npz of integer run arrays."""
+        phases = np.asarray([list(b) + list(p) for b, p in self.phases], dtype=np.int64).reshape(-1, 4) \
+            if self.phases else np.zeros((0, 4), dtype=np.int64)
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                baseline_start=self.baseline_start.astype(np.int32),
+                player_start=self.player_start.astype(np.int32),
+                baseline_step=self.baseline_step.astype(np.int8),
+                player_step=self.player_step.astype(np.int8),
+                length=self.length.astype(np.int32),
+                dtw_distance=np.float64(self.dtw_distance),
+                alignment_mode=np.str_(self.alignment_mode),
+                phases=phases
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            phases = [((int(r[0]), int(r[1])), (int(r[2]), int(r[3]))) for r in data['phases']] or None
+            return cls(data['baseline_start'], data['player_start'], data['baseline_step'],
+                       data['player_step'], data['length'], float(data['dtw_distance']),
+                       str(data['alignment_mode']), phases)
+
+    def __len__(self):
+        return int(self.length.sum())
+
+    @property
+    def num_runs(self):
+        return len(self.length)
+
+    def iter_pairs(self):
+        """Yield every (baseline_frame, player_frame) pair in path order, one run at a time."""
+        for b0, p0, db, dp, n in zip(self.baseline_start.tolist(), self.player_start.tolist(),
+                                     self.baseline_step.tolist(), self.player_step.tolist(),
+                                     self.length.tolist()):
+            for j in range(n):
+                yield b0 + j * db, p0 + j * dp
+
+    def iter_runs(self):
+        """Yield each run as a pair of (baseline_frames, player_frames) integer arrays."""
+        for b0, p0, db, dp, n in zip(self.baseline_start, self.player_start, self.baseline_step,
+                                     self.player_step, self.length):
+            j = np.arange(n)
+            yield b0 + j * db, p0 + j * dp
+
+    def _lookup(self, frames, starts, ends, steps, other_starts, other_steps):
+        frames = np.asarray(frames, dtype=np.int64)
+        if self.num_runs == 0:
+            raise ValueError("Empty alignment path")
+        if np.any(frames < starts[0]) or np.any(frames > ends[-1]):
+            raise IndexError("Frame outside the aligned range")
+        # First run reaching the frame and last run starting at or before it
+        first = np.searchsorted(ends, frames, side='left')
+        last = np.searchsorted(starts, frames, side='right') - 1
+        lo_j = np.where(steps[first] == 0, 0, frames - starts[first])
+        hi_j = np.where(steps[last] == 0, self.length[last] - 1, frames - starts[last])
+        lo = other_starts[first] + lo_j * other_steps[first]
+        hi = other_starts[last] + hi_j * other_steps[last]
+        return lo, hi
+
+    def player_to_baseline(self, player_frames):
+        """
+        Baseline frame range aligned to each player frame.
+        Returns: (lo, hi) inclusive bounds; scalars in, arrays of the same shape out.
+        """
+        return self._lookup(player_frames, self.player_start, self.player_end, self.player_step,
+                            self.baseline_start, self.baseline_step)
+
+    def baseline_to_player(self, baseline_frames):
+        """
+        Player frame range aligned to each baseline frame.
+        Returns: (lo, hi) inclusive bounds; scalars in, arrays of the same shape out.
+        """
+        return self._lookup(baseline_frames, self.baseline_start, self.baseline_end, self.baseline_step,
+                            self.player_start, self.player_step)
+
+    def _interpolate(self, frames, lookup, last_frame):
+        frames = np.asarray(frames, dtype=float)
+        lower = np.clip(np.floor(frames), 0, last_frame).astype(np.int64)
+        upper = np.clip(lower + 1, 0, last_frame)
+        lo_a, hi_a = lookup(lower)
+        lo_b, hi_b = lookup(upper)
+        frac = np.clip(frames - lower, 0.0, 1.0)
+        # Each integer frame maps to the midpoint of its aligned range
+        return (lo_a + hi_a) / 2.0 * (1 - frac) + (lo_b + hi_b) / 2.0 * frac
+
+    def player_to_baseline_interp(self, player_frames):
+        """Sub-frame baseline position for (possibly fractional) player frames."""
+        return self._interpolate(player_frames, self.player_to_baseline, self.player_end[-1])
+
+    def baseline_to_player_interp(self, baseline_frames):
+        """Sub-frame player position for (possibly fractional) baseline frames."""
+        return self._interpolate(baseline_frames, self.baseline_to_player, self.baseline_end[-1])
+
+    def mean_abs_offset(self):
+        """Mean |baseline_frame - player_frame| over all pairs, computed run by run."""
+        if self.num_runs == 0:
+            return 0.0
+        total = 0
+        for b, p in self.iter_runs():
+            total += int(np.abs(b - p).sum())
+        return total / len(self)
+
+def load_alignment(path):
+    """
+    Load an alignment artifact: the compact .npz written by step_2, or a legacy alignment_data.json.
+    Returns: AlignmentPath.
+    """
+    if str(path).endswith('.json'):
+        with open(path, 'r') as f:
+            return AlignmentPath.from_json(json.load(f))
+    return AlignmentPath.load(path)
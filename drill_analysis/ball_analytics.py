@@ -0,0 +1,209 @@
+import numpy as np
+from .alignment import check_single_person
+
+ANKLE_IDS = (27, 28)  # left_ankle, right_ankle
+
+def extract_ball_track(frame_data, frame_width, frame_height):
+    """
+    Collect the ball track, ankle keypoints and cone positions from step_1 frame records.
+    Positions are expressed in frame heights (x and y both divided by the frame height),
+    so distances and speeds do not depend on the video resolution.
+    Returns: Dict with 'ball' (num_frames, 2), 'ankles' (num_frames, 2, 2) (NaN where missing)
+    and 'cones' {track_id: (x, y)} mean cone centres.
+    """
+    check_single_person(frame_data)
+    num_frames = len(frame_data)
+    ball = np.full((num_frames, 2), np.nan)
+    ankles = np.full((num_frames, len(ANKLE_IDS), 2), np.nan)
+    cone_sums = {}
+    for i, frame in enumerate(frame_data):
+        keypoints = frame['player_keypoints']
+        for a, kid in enumerate(ANKLE_IDS):
+            kp = keypoints.get(str(kid))
+            if kp is not None and kp['visibility'] > 0.5:
+                ankles[i, a] = (kp['x'] * frame_width, kp['y'] * frame_height)
+        for obj in frame['objects']:
+            bbox = obj['bbox']
+            centre = ((bbox['x1'] + bbox['x2']) / 2.0, (bbox['y1'] + bbox['y2']) / 2.0)
+            if obj['class'] == 'ball':
+                if np.isnan(ball[i, 0]):
+                    ball[i] = centre
+            elif obj['class'] == 'cone':
+                total = cone_sums.setdefault(obj['track_id'], [0.0, 0.0, 0])
+                total[0] += centre[0]
+                total[1] += centre[1]
+                total[2] += 1
+    cones = {track_id: (sx / n / frame_height, sy / n / frame_height) for track_id, (sx, sy, n) in cone_sums.items()}
+    return {'ball': ball / frame_height, 'ankles': ankles / frame_height, 'cones': cones}
+
+def fill_gaps(values, max_gap=10):
+    """
+    Linearly interpolate NaN runs of at most max_gap frames in a 1-D series; longer gaps stay NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    if valid.sum() < 2:
+        return values.copy()
+    idx = np.arange(len(values))
+    filled = np.interp(idx, idx[valid], values[valid])
+    # Distance to the previous and next valid sample decides whether a gap is short enough
+    prev_valid = np.maximum.accumulate(np.where(valid, idx, -1))
+    next_valid = np.minimum.accumulate(np.where(valid, idx, len(values))[::-1])[::-1]
+    gap = next_valid - prev_valid - 1
+    keep = valid | ((prev_valid >= 0) & (next_valid < len(values)) & (gap <= max_gap))
+    filled[~keep] = np.nan
+    return filled
+
+def smooth(values, window=5):
+    """Centered moving average that ignores NaNs (a window with no valid sample stays NaN)."""
+    values = np.asarray(values, dtype=float)
+    if window <= 1 or len(values) == 0:
+        return values.copy()
+    valid = ~np.isnan(values)
+    kernel = np.ones(window)
+    sums = np.convolve(np.where(valid, values, 0.0), kernel, mode='same')
+    counts = np.convolve(valid.astype(float), kernel, mode='same')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = sums / counts
+    out[counts == 0] = np.nan
+    return out
+
+def ball_kinematics(ball, fps, smooth_window=5, max_gap=10):
+    """
+    Smoothed ball position, velocity, speed and acceleration for a whole session.
+    ball: (num_frames, 2) positions in frame heights, NaN where the ball was not tracked.
+    Returns: Dict of arrays: 'position' (n, 2), 'velocity' (n, 2) and 'speed', 'acceleration' (n,),
+    in frame heights per second (squared); NaN where the track is missing.
+    """
+    pos = np.stack([smooth(fill_gaps(ball[:, axis], max_gap), smooth_window) for axis in range(2)], axis=1)
+    if len(pos) < 2:
+        zeros = np.full(len(pos), np.nan)
+        return {'position': pos, 'velocity': np.full_like(pos, np.nan), 'speed': zeros, 'acceleration': zeros}
+    velocity = np.gradient(pos, axis=0) * fps
+    accel_vec = np.gradient(velocity, axis=0) * fps
+    return {
+        'position': pos,
+        'velocity': velocity,
+        'speed': np.hypot(velocity[:, 0], velocity[:, 1]),
+        'acceleration': np.hypot(accel_vec[:, 0], accel_vec[:, 1])
+    }
+
+def detect_touches(kinematics, ankles, near_distance=0.08, min_gap=5, threshold=None):
+    """
+    Touch events: the ball is within near_distance (frame heights) of either ankle while its
+    velocity changes sharply. threshold on the per-frame velocity change defaults to
+    median + 3 * MAD over the session.
+    Returns: np.int64 array of touch frame indices (one per event, events at least min_gap apart).
+    """
+    pos = kinematics['position']
+    velocity = kinematics['velocity']
+    if len(pos) < 2:
+        return np.zeros(0, dtype=np.int64)
+    dv = np.zeros(len(pos))
+    dv[1:] = np.hypot(*np.diff(velocity, axis=0).T)
+    ankle_dist = np.hypot(ankles[..., 0] - pos[:, None, 0], ankles[..., 1] - pos[:, None, 1])
+    with np.errstate(invalid='ignore'):
+        near = np.nanmin(np.where(np.isnan(ankle_dist), np.inf, ankle_dist), axis=1) < near_distance
+    valid_dv = dv[~np.isnan(dv)]
+    if len(valid_dv) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if threshold is None:
+        median = np.median(valid_dv)
+        threshold = median + 3 * np.median(np.abs(valid_dv - median))
+    with np.errstate(invalid='ignore'):
+        candidates = np.flatnonzero(near & (dv > threshold))
+    if len(candidates) == 0:
+        return candidates.astype(np.int64)
+    # First frame of each cluster of candidate frames is the touch
+    starts = np.concatenate(([True], np.diff(candidates) > min_gap))
+    return candidates[starts].astype(np.int64)
+
+def touches_per_cone(touch_frames, kinematics, cones):
+    """
+    Count touches per cone segment, assigning each touch to the cone nearest the ball at that frame.
+    Returns: Dict {cone_track_id: touch_count} over all cones (zero counts included).
+    """
+    counts = {track_id: 0 for track_id in cones}
+    if len(touch_frames) == 0 or not cones:
+        return counts
+    ids = np.array(list(cones.keys()))
+    centres = np.array(list(cones.values()))
+    ball = kinematics['position'][touch_frames]
+    nearest = np.argmin(np.hypot(ball[:, None, 0] - centres[None, :, 0], ball[:, None, 1] - centres[None, :, 1]), axis=1)
+    for track_id, count in zip(*np.unique(ids[nearest], return_counts=True)):
+        counts[track_id.item()] = int(count)
+    return counts
+
+def session_ball_metrics(frame_data, frame_width, frame_height, fps):
+    """
+    Ball kinematics and touches for one session.
+    Returns: (summary dict, touch frame array, kinematics dict).
+    """
+    track = extract_ball_track(frame_data, frame_width, frame_height)
+    kinematics = ball_kinematics(track['ball'], fps)
+    touches = detect_touches(kinematics, track['ankles'])
+    speed = kinematics['speed']
+    tracked = ~np.isnan(speed)
+    summary = {
+        'tracked_frames': int(tracked.sum()),
+        'touches': int(len(touches)),
+        'avg_speed': float(np.mean(speed[tracked])) if tracked.any() else 0.0,
+        'max_speed': float(np.max(speed[tracked])) if tracked.any() else 0.0,
+        'touches_per_cone': {str(k): v for k, v in touches_per_cone(touches, kinematics, track['cones']).items()}
+    }
+    return summary, touches, kinematics
+
+def match_touches(mapped, player_touches, match_window=15):
+    """
+    One-to-one matching of mapped baseline touches to player touches, greedily by smallest
+    offset; each touch on either side is used at most once.
+    mapped: Baseline touch frames mapped onto the player timeline.
+    Returns: Array of frame offsets of the matched pairs.
+    """
+    player_touches = np.sort(player_touches)
+    lo = np.searchsorted(player_touches, mapped - match_window, side='left')
+    hi = np.searchsorted(player_touches, mapped + match_window, side='right')
+    baseline_idx = np.repeat(np.arange(len(mapped)), hi - lo)
+    player_idx = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi)]) if len(mapped) else np.zeros(0, dtype=np.int64)
+    pair_offsets = np.abs(player_touches[player_idx] - mapped[baseline_idx])
+
+    used_baseline = np.zeros(len(mapped), dtype=bool)
+    used_player = np.zeros(len(player_touches), dtype=bool)
+    offsets = []
+    for k in np.argsort(pair_offsets, kind='stable'):
+        i, j = baseline_idx[k], player_idx[k]
+        if not used_baseline[i] and not used_player[j]:
+            used_baseline[i] = used_player[j] = True
+            offsets.append(pair_offsets[k])
+    return np.asarray(offsets, dtype=np.float64)
+
+def compare_ball_control(baseline_data, player_data, alignment, baseline_size, player_size,
+                         baseline_fps, player_fps, match_window=15):
+    """
+    Compare the player's ball control against the coach baseline through the DTW alignment.
+    Baseline touches are mapped onto the player timeline and matched one-to-one to player touches
+    within match_window frames (match_touches).
+    baseline_size, player_size: (frame_width, frame_height) of each video.
+    Returns: Dict stored under 'ball_control' in movement_analysis.json.
+    """
+    baseline, baseline_touches, _ = session_ball_metrics(baseline_data, *baseline_size, baseline_fps)
+    player, player_touches, _ = session_ball_metrics(player_data, *player_size, player_fps)
+
+    matched = 0
+    timing_offset = 0.0
+    if len(baseline_touches) and len(player_touches) and len(alignment):
+        last_baseline = alignment.baseline_end[-1]
+        mapped = alignment.baseline_to_player_interp(np.minimum(baseline_touches, last_baseline))
+        offsets = match_touches(mapped, player_touches, match_window)
+        matched = len(offsets)
+        timing_offset = float(np.mean(offsets)) if matched else 0.0
+
+    return {
+        'player': player,
+        'baseline': baseline,
+        'touch_count_diff': player['touches'] - baseline['touches'],
+        'matched_touches': matched,
+        'missed_touches': baseline['touches'] - matched,
+        'avg_touch_timing_offset': timing_offset,
+        'speed_ratio': player['avg_speed'] / baseline['avg_speed'] if baseline['avg_speed'] > 0 else 0.0
+    }
@@ -0,0 +1,174 @@
+"""
+Command-line interface: one subcommand per pipeline step plus 'run' for the full pipeline.
+
+    python -m drill_analysis extract benchmark-sample.mp4 baseline_with_detections.mp4 baseline_data.json
+    python -m drill_analysis align --mode phased
+    python -m drill_analysis analyze --player-name alex
+    python -m drill_analysis feedback
+    python -m drill_analysis run benchmark-sample.mp4 practise-sample1.mp4
+
+Step modules are imported inside the handlers, so --help and the analysis-only steps
+never load the vision stack.
+"""
+import argparse
+import datetime
+
+def _iso_date(value):
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, expected YYYY-MM-DD") from None
+
+def _store_path(args):
+    return None if args.no_store else args.store
+
+def cmd_extract(args):
+    from .extraction import process_video, save_player_sequences
+    process_video(args.input_video, args.output_video, args.output_json, concurrent=args.concurrent,
+                  build_index=not args.no_index, model_path=args.model, display=args.display,
+                  multi_person=args.multi_person, person_model_path=args.person_model,
+                  pose_workers=args.pose_workers, thumb_interval=args.thumb_interval)
+    if args.multi_person and not args.no_split_players:
+        save_player_sequences(args.output_json, min_frames=args.min_player_frames)
+
+def cmd_align(args):
+    from .alignment import main as align_main
+    align_main(args.baseline_json, args.player_json, args.output, mode=args.mode,
+               frames_per_phase=args.frames_per_phase, subsample_ratio=args.subsample_ratio,
+               plot_path=None if args.no_plot else args.plot)
+
+def cmd_analyze(args):
+    from .movement import main as movement_main
+    movement_main(args.baseline_json, args.player_json, args.alignment, args.output,
+                  player=args.player_name, drill=args.drill, session_date=args.date,
+                  store_path=_store_path(args), series_path=args.series,
+                  baseline_video=args.baseline_video, player_video=args.player_video,
+                  plot_path=None if args.no_plot else args.plot)
+
+def cmd_feedback(args):
+    from .feedback import main as feedback_main
+    feedback_main(args.baseline_video, args.player_video, args.alignment, args.movement_json,
+                  args.output_video, args.output_json, args.output_html, store_path=_store_path(args),
+                  series_path=args.series, baseline_json=args.baseline_json, player_json=args.player_json)
+
+def cmd_run(args):
+    from .extraction import process_video
+    from .alignment import main as align_main
+    from .movement import main as movement_main
+    from .feedback import main as feedback_main
+
+    store_path = _store_path(args)
+    process_video(args.baseline_video, 'baseline_with_detections.mp4', args.baseline_json,
+                  concurrent=args.concurrent, build_index=not args.no_index, model_path=args.model)
+    process_video(args.player_video, 'player_with_detections.mp4', args.player_json,
+                  concurrent=args.concurrent, build_index=not args.no_index, model_path=args.model)
+    align_main(args.baseline_json, args.player_json, args.alignment, mode=args.mode,
+               frames_per_phase=args.frames_per_phase, subsample_ratio=args.subsample_ratio)
+    movement_main(args.baseline_json, args.player_json, args.alignment, args.movement_json,
+                  player=args.player_name, drill=args.drill, session_date=args.date, store_path=store_path,
+                  series_path=args.series, baseline_video=args.baseline_video, player_video=args.player_video)
+    feedback_main(args.baseline_video, args.player_video, args.alignment, args.movement_json,
+                  args.output_video, args.output_json, args.output_html, store_path=store_path,
+                  series_path=args.series, baseline_json=args.baseline_json, player_json=args.player_json)
+
+def _add_extraction_options(parser):
+    parser.add_argument('--concurrent', action='store_true',
+                        help='run pose and detection for each frame in parallel')
+    parser.add_argument('--no-index', action='store_true', help='do not write the <video>.index/ frame index')
+    parser.add_argument('--model', default='models/best.pt', help='YOLO weights (default: %(default)s)')
+
+def _add_alignment_options(parser):
+    parser.add_argument('--mode', choices=['global', 'phased'], default='global',
+                        help='align whole sessions or drill phases independently (default: %(default)s)')
+    parser.add_argument('--frames-per-phase', type=int, default=150,
+                        help='expected phase length for phased mode (default: %(default)s)')
+    parser.add_argument('--subsample-ratio', type=float, default=None,
+                        help='align only motion-energy key frames, e.g. 4')
+
+def _add_session_options(parser):
+    parser.add_argument('--player-name', default='player', help='player recorded in the session history')
+    parser.add_argument('--drill', default='cone_dribble', help='drill recorded in the session history')
+    parser.add_argument('--date', type=_iso_date, default=None, help='session date, YYYY-MM-DD (default: today)')
+    parser.add_argument('--store', default='sessions.db', help='session history database (default: %(default)s)')
+    parser.add_argument('--no-store', action='store_true', help='do not record the session')
+    parser.add_argument('--series', default='movement_series.npz',
+                        help='per-frame angle difference series (default: %(default)s)')
+
+def _add_io_defaults(parser, *names):
+    defaults = {
+        'baseline_json': ('--baseline-json', 'baseline_data.json'),
+        'player_json': ('--player-json', 'player_data.json'),
+        'alignment': ('--alignment', 'alignment_data.npz'),
+        'movement_json': ('--movement-json', 'movement_analysis.json'),
+        'baseline_video': ('--baseline-video', 'benchmark-sample.mp4'),
+        'player_video': ('--player-video', 'practise-sample1.mp4'),
+        'output_video': ('--output-video', 'feedback_overlay.mp4'),
+        'output_json': ('--output-json', 'feedback_text.json'),
+        'output_html': ('--output-html', 'dashboard.html'),
+    }
+    for name in names:
+        flag, default = defaults[name]
+        parser.add_argument(flag, dest=name, default=default, help='(default: %(default)s)')
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='drill_analysis', description='Football drill video analysis.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    p = subparsers.add_parser('extract', help='step 1: extract keypoints and object tracks from a video')
+    p.add_argument('input_video')
+    p.add_argument('output_video', help='annotated output video')
+    p.add_argument('output_json', help='per-frame keypoints and tracks')
+    _add_extraction_options(p)
+    p.add_argument('--display', action='store_true', help='show frames while processing')
+    p.add_argument('--thumb-interval', type=int, default=None,
+                   help='frames between frame index thumbnails (default: one per second; 1 for every frame)')
+    p.add_argument('--multi-person', action='store_true',
+                   help='track every person and store keypoints per track ID (group drills)')
+    p.add_argument('--person-model', default=None,
+                   help="person detector if --model has no 'person' class, e.g. yolov8n.pt")
+    p.add_argument('--pose-workers', type=int, default=None, help='threads for per-person pose (multi-person)')
+    p.add_argument('--no-split-players', action='store_true',
+                   help='multi-person: do not write the per-player <output_json>_player<ID>.json files '
+                        'that the other steps take as input')
+    p.add_argument('--min-player-frames', type=int, default=30,
+                   help='skip players seen in fewer frames when splitting (default: %(default)s)')
+    p.set_defaults(func=cmd_extract)
+
+    p = subparsers.add_parser('align', help='step 2: align the player and baseline sessions with DTW')
+    _add_io_defaults(p, 'baseline_json', 'player_json')
+    p.add_argument('--output', default='alignment_data.npz', help='(default: %(default)s)')
+    _add_alignment_options(p)
+    p.add_argument('--plot', default='alignment_path.png', help='(default: %(default)s)')
+    p.add_argument('--no-plot', action='store_true')
+    p.set_defaults(func=cmd_align)
+
+    p = subparsers.add_parser('analyze', help='step 3: compare joint angles, timing, drill completion and ball control')
+    _add_io_defaults(p, 'baseline_json', 'player_json', 'alignment', 'baseline_video', 'player_video')
+    p.add_argument('--output', default='movement_analysis.json', help='(default: %(default)s)')
+    _add_session_options(p)
+    p.add_argument('--plot', default='angle_differences.png', help='(default: %(default)s)')
+    p.add_argument('--no-plot', action='store_true')
+    p.set_defaults(func=cmd_analyze)
+
+    p = subparsers.add_parser('feedback', help='step 4: ghost overlay video, textual feedback and dashboard')
+    _add_io_defaults(p, 'baseline_video', 'player_video', 'alignment', 'movement_json', 'baseline_json',
+                     'player_json', 'output_video', 'output_json', 'output_html')
+    p.add_argument('--store', default='sessions.db', help='session history database (default: %(default)s)')
+    p.add_argument('--no-store', action='store_true', help='do not record the feedback')
+    p.add_argument('--series', default='movement_series.npz', help='(default: %(default)s)')
+    p.set_defaults(func=cmd_feedback)
+
+    p = subparsers.add_parser('run', help='run all four steps')
+    p.add_argument('baseline_video', nargs='?', default='benchmark-sample.mp4')
+    p.add_argument('player_video', nargs='?', default='practise-sample1.mp4')
+    _add_io_defaults(p, 'baseline_json', 'player_json', 'alignment', 'movement_json',
+                     'output_video', 'output_json', 'output_html')
+    _add_extraction_options(p)
+    _add_alignment_options(p)
+    _add_session_options(p)
+    p.set_defaults(func=cmd_run)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
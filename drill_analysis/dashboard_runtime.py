@@ -0,0 +1,257 @@
+import base64
+import os
+import numpy as np
+
+def lttb(y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of a series sampled at x = 0..len(y)-1.
+    Keeps the points that preserve the visual shape (peaks and dips) of the line.
+    Returns: np.int64 array of selected indices (first and last point always included).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n, dtype=np.int64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Average of the next bucket is the third triangle vertex
+        next_start, next_end = end, (edges[i + 2] if i + 2 < len(edges) else n)
+        next_end = max(next_end, next_start + 1)
+        avg_x = (next_start + next_end - 1) / 2.0
+        avg_y = y[next_start:next_end].mean()
+        xs = np.arange(start, end)
+        areas = np.abs((prev - avg_x) * (y[start:end] - y[prev]) - (prev - xs) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(areas))
+        selected[i + 1] = prev
+    return selected
+
+def encode_array(values, dtype=np.float32):
+    """Little-endian binary array as base64 text, decoded in the browser into a typed array."""
+    return base64.b64encode(np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder('<')).tobytes()).decode('ascii')
+
+def write_timelines(series, output_html, overview_points=2000, chunk_size=8192):
+    """
+    Prepare per-frame timelines for the dashboard.
+    series: Dict {name: 1-D array} (e.g. left/right leg angle difference, DTW frame offset).
+    The HTML embeds only an LTTB overview of each series; full-resolution data is written as
+    chunk scripts next to the HTML ('<name>_data/chunk_00000.js') and loaded when the user zooms in.
+    Returns: JSON-serializable payload for the dashboard runtime.
+    """
+    base, _ = os.path.splitext(output_html)
+    chunk_dir = base + '_data'
+    os.makedirs(chunk_dir, exist_ok=True)
+    series = {name: np.asarray(values, dtype=np.float32) for name, values in series.items()}
+    length = max((len(values) for values in series.values()), default=0)
+    num_chunks = (length + chunk_size - 1) // chunk_size
+
+    for k in range(num_chunks):
+        parts = ', '.join(f'"{name}": "{encode_array(values[k * chunk_size:(k + 1) * chunk_size])}"'
+                          for name, values in series.items())
+        with open(os.path.join(chunk_dir, f'chunk_{k:05d}.js'), 'w') as f:
+            f.write(f'window.dashboardChunk({k}, {{{parts}}});\n')
+
+    overview = {}
+    for name, values in series.items():
+        idx = lttb(values, overview_points)
+        overview[name] = {'length': len(values), 'x': encode_array(idx, np.int32), 'y': encode_array(values[idx])}
+    return {
+        'length': length,
+        'chunk_size': chunk_size,
+        'num_chunks': num_chunks,
+        'chunk_dir': os.path.basename(chunk_dir),
+        'overview': overview
+    }
+
+# Self-contained chart runtime (no CDN): bar charts for the aggregates and zoomable
+# canvas line charts that switch from the embedded overview to lazily loaded chunks
+CHART_RUNTIME = r"""
+(function () {
+  function decode(b64, Type) {
+    const bin = atob(b64);
+    const bytes = new Uint8Array(bin.length);
+    for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    return new Type(bytes.buffer);
+  }
+
+  function barChart(canvas, labels, values, colors, unit) {
+    const ctx = canvas.getContext('2d');
+    const w = canvas.width, h = canvas.height, pad = 40;
+    const max = Math.max.apply(null, values.concat([1])) * 1.1;
+    const slot = (w - 2 * pad) / values.length;
+    ctx.clearRect(0, 0, w, h);
+    ctx.font = '12px Arial';
+    ctx.strokeStyle = '#999';
+    ctx.beginPath(); ctx.moveTo(pad, pad / 2); ctx.lineTo(pad, h - pad); ctx.lineTo(w - pad / 2, h - pad); ctx.stroke();
+    values.forEach(function (v, i) {
+      const bh = (h - 1.5 * pad) * v / max;
+      const x = pad + i * slot + slot * 0.2;
+      ctx.fillStyle = colors[i % colors.length];
+      ctx.fillRect(x, h - pad - bh, slot * 0.6, bh);
+      ctx.fillStyle = '#333';
+      ctx.textAlign = 'center';
+      ctx.fillText(labels[i], x + slot * 0.3, h - pad + 16);
+      ctx.fillText(v.toFixed(2) + (unit || ''), x + slot * 0.3, h - pad - bh - 4);
+    });
+  }
+
+  const chunks = {}, pending = {}, timelineCharts = [];
+  let timelineData = null;
+
+  window.dashboardChunk = function (k, data) {
+    const decoded = {};
+    for (const name in data) decoded[name] = decode(data[name], Float32Array);
+    chunks[k] = decoded;
+    if (pending[k]) { pending[k].forEach(function (fn) { fn(); }); delete pending[k]; }
+  };
+
+  function loadChunk(k) {
+    return new Promise(function (resolve) {
+      if (chunks[k]) return resolve();
+      if (pending[k]) return pending[k].push(resolve);
+      pending[k] = [resolve];
+      const script = document.createElement('script');
+      script.src = timelineData.chunk_dir + '/chunk_' + String(k).padStart(5, '0') + '.js';
+      script.onerror = function () { delete pending[k]; resolve(); };
+      document.head.appendChild(script);
+    });
+  }
+
+  function TimelineChart(canvas, names, colors, yLabel) {
+    this.canvas = canvas;
+    this.ctx = canvas.getContext('2d');
+    this.names = names.filter(function (n) { return timelineData.overview[n]; });
+    this.colors = colors;
+    this.yLabel = yLabel;
+    this.series = this.names.map(function (n) {
+      const o = timelineData.overview[n];
+      return { name: n, length: o.length, x: decode(o.x, Int32Array), y: decode(o.y, Float32Array) };
+    });
+    this.total = Math.max.apply(null, this.series.map(function (s) { return s.length; }).concat([1]));
+    this.view = [0, this.total - 1];
+    this.bindEvents();
+    this.draw();
+  }
+
+  TimelineChart.prototype.fullResolution = function () {
+    // Switch to raw samples once the visible range is dense enough to be worth loading
+    return this.view[1] - this.view[0] <= (this.canvas.width - 60) * 8;
+  };
+
+  TimelineChart.prototype.ensureChunks = function () {
+    if (!this.fullResolution()) return Promise.resolve();
+    const first = Math.floor(this.view[0] / timelineData.chunk_size);
+    const last = Math.floor(this.view[1] / timelineData.chunk_size);
+    const loads = [];
+    for (let k = first; k <= last; k++) loads.push(loadChunk(k));
+    return Promise.all(loads);
+  };
+
+  TimelineChart.prototype.points = function (s) {
+    const v0 = this.view[0], v1 = this.view[1], xs = [], ys = [];
+    if (this.fullResolution()) {
+      const cs = timelineData.chunk_size;
+      let complete = true;
+      for (let i = Math.max(0, Math.floor(v0)); i <= Math.min(s.length - 1, Math.ceil(v1)); i++) {
+        const c = chunks[Math.floor(i / cs)];
+        if (!c) { complete = false; break; }
+        xs.push(i); ys.push(c[s.name][i % cs]);
+      }
+      if (complete) return [xs, ys];
+      xs.length = 0; ys.length = 0;
+    }
+    for (let i = 0; i < s.x.length; i++) {
+      if (s.x[i] >= v0 && s.x[i] <= v1) { xs.push(s.x[i]); ys.push(s.y[i]); }
+    }
+    return [xs, ys];
+  };
+
+  TimelineChart.prototype.draw = function () {
+    const ctx = this.ctx, w = this.canvas.width, h = this.canvas.height, pad = 40;
+    const self = this;
+    const data = this.series.map(function (s) { return self.points(s); });
+    let lo = Infinity, hi = -Infinity;
+    data.forEach(function (d) { d[1].forEach(function (v) { if (v < lo) lo = v; if (v > hi) hi = v; }); });
+    if (!isFinite(lo)) { lo = 0; hi = 1; }
+    if (hi === lo) { hi = lo + 1; }
+    const sx = function (x) { return pad + (x - self.view[0]) / Math.max(self.view[1] - self.view[0], 1) * (w - pad - 10); };
+    const sy = function (y) { return h - pad - (y - lo) / (hi - lo) * (h - pad - 10); };
+    ctx.clearRect(0, 0, w, h);
+    ctx.font = '12px Arial';
+    ctx.fillStyle = '#333';
+    ctx.strokeStyle = '#999';
+    ctx.beginPath(); ctx.moveTo(pad, 10); ctx.lineTo(pad, h - pad); ctx.lineTo(w - 10, h - pad); ctx.stroke();
+    ctx.textAlign = 'right';
+    [lo, (lo + hi) / 2, hi].forEach(function (v) { ctx.fillText(v.toFixed(1), pad - 4, sy(v) + 4); });
+    ctx.textAlign = 'center';
+    [this.view[0], (this.view[0] + this.view[1]) / 2, this.view[1]].forEach(function (v) {
+      ctx.fillText(Math.round(v), sx(v), h - pad + 16);
+    });
+    ctx.fillText('Aligned frame pair' + (this.fullResolution() ? ' (full resolution)' : ' (overview)'), w / 2, h - 6);
+    ctx.save(); ctx.translate(12, h / 2); ctx.rotate(-Math.PI / 2); ctx.fillText(this.yLabel, 0, 0); ctx.restore();
+    data.forEach(function (d, si) {
+      ctx.strokeStyle = self.colors[si % self.colors.length];
+      ctx.beginPath();
+      for (let i = 0; i < d[0].length; i++) {
+        if (i === 0) ctx.moveTo(sx(d[0][i]), sy(d[1][i])); else ctx.lineTo(sx(d[0][i]), sy(d[1][i]));
+      }
+      ctx.stroke();
+      ctx.fillStyle = self.colors[si % self.colors.length];
+      ctx.textAlign = 'left';
+      ctx.fillText(self.names[si], pad + 10 + si * 140, 20);
+    });
+    if (this.selection) {
+      ctx.fillStyle = 'rgba(54, 162, 235, 0.2)';
+      ctx.fillRect(Math.min(this.selection[0], this.selection[1]), 10,
+                   Math.abs(this.selection[1] - this.selection[0]), h - pad - 10);
+    }
+  };
+
+  TimelineChart.prototype.zoom = function (v0, v1) {
+    const self = this;
+    this.view = [Math.max(0, v0), Math.min(this.total - 1, Math.max(v1, v0 + 2))];
+    this.draw();
+    this.ensureChunks().then(function () { self.draw(); });
+  };
+
+  TimelineChart.prototype.bindEvents = function () {
+    const self = this, pad = 40;
+    const toData = function (px) {
+      return self.view[0] + (px - pad) / (self.canvas.width - pad - 10) * (self.view[1] - self.view[0]);
+    };
+    // Mouse position in canvas pixels: CSS may scale the canvas (width: 100%), so scale by canvas.width / rect.width
+    const offset = function (e) {
+      const rect = self.canvas.getBoundingClientRect();
+      return (e.clientX - rect.left) * self.canvas.width / rect.width;
+    };
+    this.canvas.addEventListener('mousedown', function (e) { self.selection = [offset(e), offset(e)]; });
+    this.canvas.addEventListener('mousemove', function (e) {
+      if (self.selection) { self.selection[1] = offset(e); self.draw(); }
+    });
+    this.canvas.addEventListener('mouseup', function () {
+      const sel = self.selection;
+      self.selection = null;
+      if (sel && Math.abs(sel[1] - sel[0]) > 4) {
+        self.zoom(toData(Math.min(sel[0], sel[1])), toData(Math.max(sel[0], sel[1])));
+      } else {
+        self.draw();
+      }
+    });
+    this.canvas.addEventListener('dblclick', function () { self.zoom(0, self.total - 1); });
+  };
+
+  window.DrillDashboard = {
+    barChart: barChart,
+    timelines: function (data, charts) {
+      timelineData = data;
+      charts.forEach(function (c) {
+        timelineCharts.push(new TimelineChart(document.getElementById(c.canvas), c.series, c.colors, c.yLabel));
+      });
+    }
+  };
+})();
+"""
@@ -0,0 +1,553 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+from .frame_pool import FrameBufferPool, draw_skeleton, to_rgb
+from .frame_index import FrameIndexWriter, is_keyframe
+
+# MediaPipe, YOLO and the SORT tracker are heavy to import and initialise, so they are
+# created on first use by load_models() rather than when the module is imported
+mp_pose = None
+mp_drawing = None
+pose = None
+yolo_model = None
+tracker = None
+_model_path = None
+# Multi-person mode: detector used for people (the main YOLO model when it has a 'person' class)
+# and a SORT tracker of its own, so person track state never mixes with balls and cones
+person_model = None
+person_class_id = None
+person_tracker = None
+
+def load_models(model_path='models/best.pt'):
+    """
+    Initialise MediaPipe Pose, the YOLO detector (replace with your trained model path,
+    e.g. 'runs/detect/ball_cone_detector/weights/best.pt') and the SORT tracker.
+    Does nothing if the same model is already loaded.
+    """
+    global mp_pose, mp_drawing, pose, yolo_model, tracker, _model_path
+    if yolo_model is not None and _model_path == model_path:
+        return
+    import mediapipe as mp
+    from ultralytics import YOLO
+    from .sort import Sort
+
+    mp_pose = mp.solutions.pose
+    mp_drawing = mp.solutions.drawing_utils
+    pose = _new_pose()
+    yolo_model = YOLO(model_path)
+    tracker = Sort()
+    _model_path = model_path
+
+def _new_pose():
+    return mp_pose.Pose(static_image_mode=False, model_complexity=1, enable_segmentation=False, min_detection_confidence=0.5)
+
+def reset_pose():
+    """Replace the MediaPipe Pose instance so no landmark tracking state carries over."""
+    global pose
+    pose.close()
+    pose = _new_pose()
+
+def load_person_detector(person_model_path=None, max_age=5):
+    """
+    Set up person detection and tracking for multi-person mode (call after load_models).
+    People are taken from the main YOLO pass when its model has a 'person' class, so one detection
+    pass serves objects and players. Otherwise person_model_path (e.g. a COCO model such as
+    'yolov8n.pt') is loaded and run for the person class only.
+    max_age: Frames a person track survives without a matching detection.
+    """
+    global person_model, person_class_id, person_tracker
+    from .sort import Sort
+
+    if person_model_path is None:
+        model = yolo_model
+    else:
+        from ultralytics import YOLO
+        model = YOLO(person_model_path)
+    class_ids = [cls for cls, name in model.names.items() if name == 'person']
+    if not class_ids:
+        raise ValueError(f"Detector {person_model_path or _model_path} has no 'person' class; "
+                         "pass a person model (e.g. 'yolov8n.pt') for multi-person mode")
+    person_model = model
+    person_class_id = class_ids[0]
+    person_tracker = Sort(max_age=max_age)
+
+def reset_tracker():
+    """
+    Start fresh SORT trackers with track IDs counting from the start again, so each video gets
+    the same IDs as in a standalone run (drill completion compares cone IDs across sessions).
+    """
+    global tracker, person_tracker
+    from .sort import KalmanBoxTracker, Sort
+    KalmanBoxTracker.count = 0
+    tracker = Sort()
+    if person_tracker is not None:
+        person_tracker = Sort(max_age=person_tracker.max_age)
+
+def estimate_pose(image_rgb):
+    """
+    Run MediaPipe Pose on an RGB frame.
+    Returns: (pose_landmarks or None, keypoints dict {landmark_idx: {'x', 'y', 'z', 'visibility'}}).
+    """
+    pose_results = pose.process(image_rgb)
+    keypoints = {}
+    if pose_results.pose_landmarks:
+        for idx, landmark in enumerate(pose_results.pose_landmarks.landmark):
+            keypoints[idx] = {
+                'x': float(landmark.x),
+                'y': float(landmark.y),
+                'z': float(landmark.z),
+                'visibility': float(landmark.visibility)
+            }
+    return pose_results.pose_landmarks, keypoints
+
+def detect_objects(frame, model=None, classes=None):
+    """
+    Run YOLO detection on a BGR frame (the main detector unless model is given).
+    classes: Optional list of class IDs to keep.
+    Returns: Boxes as [(x1, y1, x2, y2, conf, label)].
+    """
+    model = yolo_model if model is None else model
+    yolo_results = model(frame, conf=0.6, iou=0.3, classes=classes)[0]
+    boxes = []
+    for det in yolo_results.boxes:
+        x1, y1, x2, y2 = map(int, det.xyxy[0])
+        boxes.append((x1, y1, x2, y2, float(det.conf[0]), model.names[int(det.cls[0])]))
+    return boxes
+
+def _to_detections(boxes):
+    """Boxes as the (N, 5) [x1, y1, x2, y2, conf] array SORT expects."""
+    return np.array([box[:5] for box in boxes], dtype=float) if boxes else np.empty((0, 5))
+
+def track_objects(boxes):
+    """
+    Update the SORT tracker with detected boxes.
+    Returns: Tracked objects list for the JSON record.
+    """
+    detections = _to_detections(boxes)
+    trackers = tracker.update(detections)
+    tracked_objects = []
+    for track in trackers:
+        x1, y1, x2, y2, track_id = map(int, track)
+        label = 'ball' if any(box[4] > 0.5 and box[5] == 'ball'
+                             for box in boxes if np.allclose(box[:4], track[:4], atol=5)) else 'cone'
+        tracked_objects.append({
+            'track_id': track_id,
+            'class': label,
+            'bbox': {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2}
+        })
+    return tracked_objects
+
+def detect_and_track(frame):
+    """
+    Run YOLO detection on a BGR frame and update the SORT tracker.
+    Does not draw on the frame, so it can run while pose estimation reads the same image.
+    Returns: (boxes as [(x1, y1, x2, y2, conf, label)], tracked objects list for the JSON record).
+    """
+    boxes = detect_objects(frame)
+    return boxes, track_objects(boxes)
+
+def detect_and_track_people(frame):
+    """
+    Multi-person detection and tracking: one YOLO pass for objects and people (plus a person-only
+    pass when a separate person model is loaded), with people tracked by person_tracker.
+    Returns: (boxes, tracked objects list, person tracks as [(track_id, x1, y1, x2, y2)]).
+    """
+    boxes = detect_objects(frame)
+    if person_model is yolo_model:
+        person_boxes = [box for box in boxes if box[5] == 'person']
+    else:
+        person_boxes = detect_objects(frame, person_model, classes=[person_class_id])
+    boxes = [box for box in boxes if box[5] != 'person']
+    tracked_objects = track_objects(boxes)
+    people = [(int(track[4]), *map(int, track[:4])) for track in person_tracker.update(_to_detections(person_boxes))]
+    return boxes + person_boxes, tracked_objects, people
+
+def draw_annotations(frame, pose_landmarks, boxes, tracked_objects):
+    """Draw the skeleton, detection boxes and track IDs onto the BGR frame in place."""
+    if pose_landmarks:
+        mp_drawing.draw_landmarks(frame, pose_landmarks, mp_pose.POSE_CONNECTIONS)
+    for x1, y1, x2, y2, conf, label in boxes:
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(frame, f'{label} {conf:.2f}', (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+    for obj in tracked_objects:
+        bbox = obj['bbox']
+        cv2.putText(frame, f"ID: {obj['track_id']}", (bbox['x1'], bbox['y1']-30), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
+
+def analyze_frame(frame, executor=None, pool=None):
+    """
+    Run pose estimation and detection+tracking on one frame.
+    If an executor is given, both stages are dispatched concurrently and joined before returning;
+    MediaPipe and YOLO spend most of their time in native code, so the two overlap.
+    If a FrameBufferPool is given, the RGB conversion is written into its pooled buffer.
+    Returns: (pose_landmarks, keypoints, boxes, tracked_objects).
+    """
+    # Convert to RGB for MediaPipe
+    image_rgb = to_rgb(frame, pool) if pool is not None else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    if executor is None:
+        pose_landmarks, keypoints = estimate_pose(image_rgb)
+        boxes, tracked_objects = detect_and_track(frame)
+    else:
+        pose_future = executor.submit(estimate_pose, image_rgb)
+        detect_future = executor.submit(detect_and_track, frame)
+        pose_landmarks, keypoints = pose_future.result()
+        boxes, tracked_objects = detect_future.result()
+    return pose_landmarks, keypoints, boxes, tracked_objects
+
+class MultiPersonPose:
+    """
+    Multi-person pose estimation on per-person crops.
+    MediaPipe Pose is single-person and keeps tracking state between frames, so each person track
+    gets its own Pose instance; the crops of one frame are processed as a batch on a thread pool
+    and joined before the frame record is written. Landmarks are mapped back to normalized
+    full-frame coordinates, so per-player records look like single-person ones.
+    """
+
+    def __init__(self, executor=None, margin=0.15, max_missing=30):
+        """
+        executor: Thread pool for the per-crop pose runs (sequential if None).
+        margin: Fraction of the box size added on each side of a person crop.
+        max_missing: Frames a track can go unseen before its Pose instance is closed.
+        """
+        self.executor = executor
+        self.margin = margin
+        self.max_missing = max_missing
+        self.poses = {}  # track_id -> MediaPipe Pose
+        self.last_seen = {}  # track_id -> frame index
+
+    def _pose_for(self, track_id):
+        if track_id not in self.poses:
+            self.poses[track_id] = mp_pose.Pose(static_image_mode=False, model_complexity=1,
+                                                enable_segmentation=False, min_detection_confidence=0.5)
+        return self.poses[track_id]
+
+    def _crop_box(self, bbox, frame_width, frame_height):
+        x1, y1, x2, y2 = bbox
+        pad_x = int((x2 - x1) * self.margin)
+        pad_y = int((y2 - y1) * self.margin)
+        return (max(x1 - pad_x, 0), max(y1 - pad_y, 0),
+                min(x2 + pad_x, frame_width), min(y2 + pad_y, frame_height))
+
+    @staticmethod
+    def _estimate(person_pose, crop, crop_box, frame_width, frame_height):
+        """Pose on one crop; keypoints in normalized full-frame coordinates."""
+        results = person_pose.process(crop)
+        keypoints = {}
+        if results.pose_landmarks:
+            cx1, cy1, cx2, cy2 = crop_box
+            crop_width, crop_height = cx2 - cx1, cy2 - cy1
+            for idx, landmark in enumerate(results.pose_landmarks.landmark):
+                keypoints[str(idx)] = {
+                    'x': (cx1 + float(landmark.x) * crop_width) / frame_width,
+                    'y': (cy1 + float(landmark.y) * crop_height) / frame_height,
+                    'z': float(landmark.z) * crop_width / frame_width,  # z shares the x scale
+                    'visibility': float(landmark.visibility)
+                }
+        return keypoints
+
+    def process(self, image_rgb, people, frame_idx):
+        """
+        Run pose for every tracked person in one RGB frame.
+        people: Person tracks as [(track_id, x1, y1, x2, y2)] from detect_and_track_people.
+        Returns: Dict {str(track_id): {'bbox': {...}, 'keypoints': {...}}}.
+        """
+        frame_height, frame_width = image_rgb.shape[:2]
+        jobs = []
+        for track_id, *bbox in people:
+            crop_box = self._crop_box(bbox, frame_width, frame_height)
+            cx1, cy1, cx2, cy2 = crop_box
+            if cx2 - cx1 < 2 or cy2 - cy1 < 2:
+                continue
+            # MediaPipe needs a contiguous image, so the crop is copied out of the frame
+            crop = np.ascontiguousarray(image_rgb[cy1:cy2, cx1:cx2])
+            args = (self._pose_for(track_id), crop, crop_box, frame_width, frame_height)
+            job = self.executor.submit(self._estimate, *args) if self.executor is not None else self._estimate(*args)
+            jobs.append((track_id, bbox, job))
+            self.last_seen[track_id] = frame_idx
+
+        players = {}
+        for track_id, (x1, y1, x2, y2), job in jobs:
+            players[str(track_id)] = {
+                'bbox': {'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2},
+                'keypoints': job.result() if self.executor is not None else job
+            }
+
+        # Close Pose instances of tracks that have left the shot
+        for track_id in [t for t, seen in self.last_seen.items() if frame_idx - seen > self.max_missing]:
+            self.poses.pop(track_id).close()
+            del self.last_seen[track_id]
+        return players
+
+    def close(self):
+        for person_pose in self.poses.values():
+            person_pose.close()
+        self.poses.clear()
+        self.last_seen.clear()
+
+def analyze_frame_people(frame, people_pose, frame_idx, pool=None):
+    """
+    Multi-person counterpart of analyze_frame: detection and tracking of objects and people,
+    then pose on every person crop (see MultiPersonPose).
+    Returns: (boxes, tracked_objects, players).
+    """
+    image_rgb = to_rgb(frame, pool) if pool is not None else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    boxes, tracked_objects, people = detect_and_track_people(frame)
+    players = people_pose.process(image_rgb, people, frame_idx)
+    return boxes, tracked_objects, players
+
+# BGR colours cycled by track ID, so a player keeps the same colour throughout the video
+_PLAYER_COLORS = [(0, 0, 255), (255, 0, 0), (0, 200, 255), (255, 0, 255), (255, 255, 0), (0, 128, 255), (128, 0, 255)]
+
+def draw_players(frame, players):
+    """Draw each player's skeleton and track ID onto the BGR frame in place."""
+    frame_height, frame_width = frame.shape[:2]
+    for track_id, player in players.items():
+        color = _PLAYER_COLORS[int(track_id) % len(_PLAYER_COLORS)]
+        draw_skeleton(frame, player['keypoints'], mp_pose.POSE_CONNECTIONS, color, frame_width, frame_height)
+        bbox = player['bbox']
+        cv2.putText(frame, f"Player {track_id}", (bbox['x1'], bbox['y1'] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+
+def split_players(frame_data, min_frames=1):
+    """
+    Split multi-person frame records into one single-person sequence per track ID.
+    Every sequence has a record for every frame ('player_keypoints' is empty where the player was not
+    seen), so sequence positions stay video frame numbers and the sequences can go through alignment,
+    movement analysis and feedback unchanged.
+    min_frames: Drop tracks seen with keypoints in fewer frames (e.g. passers-by).
+    Returns: Dict {track_id: [{'frame', 'player_keypoints', 'objects'}, ...]}.
+    """
+    counts = {}
+    for record in frame_data:
+        for track_id, player in record['players'].items():
+            if player['keypoints']:
+                counts[track_id] = counts.get(track_id, 0) + 1
+    track_ids = sorted((t for t, n in counts.items() if n >= min_frames), key=int)
+    sequences = {track_id: [] for track_id in track_ids}
+    for record in frame_data:
+        for track_id in track_ids:
+            player = record['players'].get(track_id)
+            player_record = {
+                'frame': record['frame'],
+                'player_keypoints': player['keypoints'] if player else {},
+                'objects': record['objects']
+            }
+            if 'video' in record:
+                player_record['video'] = record['video']
+            sequences[track_id].append(player_record)
+    return sequences
+
+def summarize_latency(latencies_ms):
+    """
+    Summarize per-frame latencies (milliseconds).
+    Returns: Dict with frame count, mean, median, p95 and max latency.
+    """
+    latencies_ms = np.asarray(latencies_ms, dtype=float)
+    if len(latencies_ms) == 0:
+        return {'frames': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+    return {
+        'frames': int(len(latencies_ms)),
+        'mean_ms': float(np.mean(latencies_ms)),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'max_ms': float(np.max(latencies_ms))
+    }
+
+def compare_frame_latency(input_video_path, max_frames=300, model_path='models/best.pt', warmup_frames=10, rounds=2):
+    """
+    Measure per-frame analysis latency of the sequential and concurrent paths on the same frames.
+    warmup_frames untimed frames first pay the one-time YOLO/MediaPipe setup and thread pool start-up.
+    Each timed run starts with a fresh SORT tracker and Pose instance so no state leaks between runs,
+    and the mode order alternates over rounds (sequential, concurrent, concurrent, sequential, ...)
+    so neither mode always runs first.
+    Returns: Dict {'sequential': summary, 'concurrent': summary} over all rounds.
+    """
+    load_models(model_path)
+    cap = cv2.VideoCapture(input_video_path)
+    if not cap.isOpened():
+        print("Error opening video file")
+        return None
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+
+    latencies = {'sequential': [], 'concurrent': []}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for frame in frames[:warmup_frames]:
+            analyze_frame(frame, executor=executor)
+        modes = (('sequential', None), ('concurrent', executor))
+        for r in range(rounds):
+            for mode, mode_executor in (modes if r % 2 == 0 else modes[::-1]):
+                reset_tracker()
+                reset_pose()
+                for frame in frames:
+                    start = time.perf_counter()
+                    analyze_frame(frame, executor=mode_executor)
+                    latencies[mode].append((time.perf_counter() - start) * 1000.0)
+    reset_tracker()
+    reset_pose()
+    results = {mode: summarize_latency(values) for mode, values in latencies.items()}
+
+    for mode, stats in results.items():
+        print(f"{mode.capitalize()} per-frame latency: mean {stats['mean_ms']:.1f} ms, "
+              f"p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms over {stats['frames']} frames")
+    if results['concurrent']['mean_ms'] > 0:
+        print(f"Concurrent speed-up (mean latency): {results['sequential']['mean_ms'] / results['concurrent']['mean_ms']:.2f}x")
+    return results
+
+def process_video(input_video_path, output_video_path, output_json_path, concurrent=False, build_index=True,
+                  model_path='models/best.pt', display=False, multi_person=False, person_model_path=None,
+                  pose_workers=None, thumb_interval=None):
+    """
+    Extract keypoints and object tracks from a video.
+    concurrent: If True, pose estimation and detection+tracking run in parallel for each frame
+    (lower per-frame latency for live feedback); frame records are identical to the sequential path.
+    build_index: If True, the random-access frame index of the input video (timestamps, keyframe table,
+    sparse thumbnail strip; see frame_index) is built in the same decode pass.
+    thumb_interval: Frames between index thumbnails (default: one per second; 1 for full rate).
+    display: Show the annotated frames in a window while processing (press q to stop).
+    multi_person: If True, people are detected in the YOLO pass (or by person_model_path, see
+    load_person_detector), tracked with their own SORT tracker and posed on per-person crops
+    (see MultiPersonPose). Each frame record then holds 'players', keyed by str(track_id), instead
+    of 'player_keypoints'; split_players() turns them into per-player sequences.
+    pose_workers: Thread pool size for the per-crop pose runs in multi-person mode. concurrent does not
+    apply there (pose needs the person tracks, so it runs after detection) and is rejected.
+    """
+    if multi_person and concurrent:
+        raise ValueError("concurrent=True cannot be combined with multi_person=True: per-person pose needs "
+                         "the person tracks, so crops are parallelised instead (see pose_workers)")
+    load_models(model_path)
+    if multi_person:
+        load_person_detector(person_model_path)
+    # No track state or IDs carried over from a previous video processed in this process
+    reset_tracker()
+    # Open video
+    cap = cv2.VideoCapture(input_video_path)
+    if not cap.isOpened():
+        print("Error opening video file")
+        return
+
+    # Get video properties
+    frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+
+    # Initialize video writer
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(output_video_path, fourcc, fps, (frame_width, frame_height))
+
+    # Store all frame data for JSON
+    frame_data = []
+    latencies = []
+    player_frames = 0
+    if multi_person:
+        executor = ThreadPoolExecutor(max_workers=pose_workers)
+        people_pose = MultiPersonPose(executor)
+    else:
+        executor = ThreadPoolExecutor(max_workers=2) if concurrent else None
+    # Decoded frame and its RGB copy live in preallocated buffers reused every frame
+    pool = FrameBufferPool()
+    frame = pool.get('frame', (frame_height, frame_width, 3))
+    index_writer = None
+    if build_index:
+        try:
+            index_writer = FrameIndexWriter(input_video_path, frame_width, frame_height, fps,
+                                            thumb_interval=thumb_interval)
+        except OSError as e:
+            print(f"Warning: cannot write the frame index ({e}); continuing without it")
+
+    while cap.isOpened():
+        ret, frame = cap.read(frame)
+        if not ret:
+            break
+        if index_writer is not None:
+            index_writer.add(frame, cap.get(cv2.CAP_PROP_POS_MSEC), is_keyframe(cap))
+
+        # 1. Pose Estimation with MediaPipe, 2. Object Detection with YOLO, 3. Object Tracking with SORT
+        start = time.perf_counter()
+        if multi_person:
+            boxes, tracked_objects, players = analyze_frame_people(frame, people_pose, len(frame_data), pool)
+        else:
+            pose_landmarks, keypoints, boxes, tracked_objects = analyze_frame(frame, executor, pool)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+        # Annotate only after both stages are done so YOLO never sees the drawn skeleton
+        if multi_person:
+            draw_annotations(frame, None, boxes, tracked_objects)
+            draw_players(frame, players)
+            player_frames += len(players)
+            record = {'frame': len(frame_data), 'players': players, 'objects': tracked_objects}
+        else:
+            draw_annotations(frame, pose_landmarks, boxes, tracked_objects)
+            record = {'frame': len(frame_data), 'player_keypoints': keypoints, 'objects': tracked_objects}
+
+        # Store frame data; the first record also carries the video geometry, so later steps
+        # can scale pixel positions without opening the video
+        if not frame_data:
+            record['video'] = {'frame_width': frame_width, 'frame_height': frame_height, 'fps': fps}
+        frame_data.append(record)
+
+        # Write frame to output video
+        out.write(frame)
+
+        # Display frame (optional)
+        if display:
+            cv2.imshow('Frame', frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+    # Cleanup
+    if multi_person:
+        people_pose.close()
+    if executor is not None:
+        executor.shutdown()
+    if index_writer is not None:
+        index_writer.close()
+    cap.release()
+    out.release()
+    if display:
+        cv2.destroyAllWindows()
+
+    # Save to JSON
+    with open(output_json_path, 'w') as f:
+        json.dump(frame_data, f, indent=4)
+    print(f"Processed video saved to {output_video_path}")
+    print(f"Data saved to {output_json_path}")
+
+    stats = summarize_latency(latencies)
+    if multi_person:
+        # Throughput in player-frames: one frame of pose for one tracked player
+        analysis_s = sum(latencies) / 1000.0
+        stats['player_frames'] = player_frames
+        stats['player_frames_per_s'] = player_frames / analysis_s if analysis_s > 0 else 0.0
+        print(f"Multi-person analysis: {player_frames} player-frames in {analysis_s:.1f} s "
+              f"({stats['player_frames_per_s']:.1f} player-frames/s, {stats['frames']} frames, "
+              f"mean {stats['mean_ms']:.1f} ms per frame)")
+    else:
+        print(f"{'Concurrent' if concurrent else 'Sequential'} per-frame analysis latency: "
+              f"mean {stats['mean_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms over {stats['frames']} frames")
+    return stats
+
+def save_player_sequences(input_json_path, output_prefix=None, min_frames=30):
+    """
+    Write one single-person JSON per tracked player from a multi-person extraction
+    ('<output_prefix>_player<track_id>.json', output_prefix defaulting to the input path without
+    .json), ready for the alignment, analysis and feedback steps.
+    Returns: Dict {track_id: json_path}.
+    """
+    with open(input_json_path, 'r') as f:
+        frame_data = json.load(f)
+    if output_prefix is None:
+        output_prefix = input_json_path[:-5] if input_json_path.endswith('.json') else input_json_path
+    paths = {}
+    for track_id, sequence in split_players(frame_data, min_frames).items():
+        paths[track_id] = f"{output_prefix}_player{track_id}.json"
+        with open(paths[track_id], 'w') as f:
+            json.dump(sequence, f, indent=4)
+        print(f"Player {track_id}: {sum(1 for r in sequence if r['player_keypoints'])} frames saved to {paths[track_id]}")
+    return paths
@@ -0,0 +1,237 @@
+import json
+import os
+import numpy as np
+from .alignment import check_single_person
+from .alignment_path import load_alignment
+from .session_store import SessionStore
+from .dashboard_runtime import CHART_RUNTIME, write_timelines
+
+# MediaPipe pose connections (mp.solutions.pose.POSE_CONNECTIONS), kept here so drawing
+# the skeletons does not need to import MediaPipe
+POSE_CONNECTIONS = frozenset([
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),
+    (11, 23), (12, 24), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28),
+    (27, 29), (28, 30), (29, 31), (30, 32), (27, 31), (28, 32)
+])
+
+def load_json_data(json_path):
+    with open(json_path, 'r') as f:
+        return json.load(f)
+
+def create_ghost_overlay(baseline_video, player_video, alignment, output_video,
+                         baseline_json='baseline_data.json', player_json='player_data.json'):
+    import cv2
+    from .frame_pool import FrameBufferPool, render_ghost_frame
+    from .frame_index import FrameReader
+
+    # Open videos through their frame indexes (built by step_1, or here on first use) for
+    # frame-accurate random access; aligned pairs are monotone, so most reads need no seek
+    try:
+        baseline_reader = FrameReader(baseline_video)
+        player_reader = FrameReader(player_video)
+    except IOError as e:
+        print(f"Error opening video files: {e}")
+        return
+
+    # Get video properties
+    frame_width = player_reader.index.meta['frame_width']
+    frame_height = player_reader.index.meta['frame_height']
+    fps = player_reader.index.meta['fps']
+
+    # Initialize video writer
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(output_video, fourcc, fps, (frame_width, frame_height))
+
+    # Define MediaPipe pose connections
+    pose_connections = POSE_CONNECTIONS
+
+    # Keypoints per frame index, loaded once rather than per aligned pair
+    baseline_data = load_json_data(baseline_json)
+    player_data = load_json_data(player_json)
+    check_single_person(baseline_data)
+    check_single_person(player_data)
+    baseline_keypoints = {f['frame']: f['player_keypoints'] for f in baseline_data}
+    player_keypoints = {f['frame']: f['player_keypoints'] for f in player_data}
+
+    # Preallocated frame buffers: decoded frames are read straight into them and the overlay
+    # is rendered in place, so the loop does no frame-sized allocations
+    pool = FrameBufferPool()
+    b_frame_img = pool.get('baseline', (baseline_reader.index.meta['frame_height'],
+                                        baseline_reader.index.meta['frame_width'], 3))
+    p_frame_img = pool.get('player', (frame_height, frame_width, 3))
+    coach_skeleton = pool.get('coach_skeleton', (frame_height, frame_width, 3), zero=True)
+    alpha = 0.4  # Transparency for coach's skeleton
+
+    # Process aligned frames
+    for b_frame, p_frame in alignment.iter_pairs():
+        # Read frames
+        ret_b, b_frame_img = baseline_reader.read(b_frame, b_frame_img)
+        ret_p, p_frame_img = player_reader.read(p_frame, p_frame_img)
+        if not (ret_b and ret_p):
+            continue
+
+        # Ghost overlay: coach's skeleton (blue) blended over its bounding box, player's (red) on top
+        render_ghost_frame(p_frame_img, coach_skeleton, baseline_keypoints.get(b_frame),
+                           player_keypoints.get(p_frame), pose_connections, alpha)
+
+        out.write(p_frame_img)
+
+    baseline_reader.release()
+    player_reader.release()
+    out.release()
+    print(f"Ghost overlay video saved to {output_video}")
+
+def generate_textual_feedback(movement_analysis):
+    feedback = []
+    form = movement_analysis['form_accuracy']
+    timing = movement_analysis['timing_consistency']
+    completion = movement_analysis['drill_completion']
+
+    # Form feedback
+    if form['left_leg_angle_diff'] > 15:
+        feedback.append("Improve left leg form: Bend your knee more during turns or sprints to match the coach's posture.")
+    if form['right_leg_angle_diff'] > 15:
+        feedback.append("Improve right leg form: Align your ankle and knee closer to the coach's during footwork.")
+    if form['overall_angle_diff'] < 15:
+        feedback.append("Good overall form! Your posture closely matches the coach's.")
+    elif form['overall_angle_diff'] > 25:
+        feedback.append("Significant form differences detected. Focus on aligning your body posture with the coach's.")
+
+    # Timing feedback
+    if timing['avg_frame_offset'] > 15:
+        feedback.append(f"Timing issue: Your actions are off by ~{int(timing['avg_frame_offset'])} frames. Try to match the coach's pace, especially during transitions.")
+    if timing['dtw_distance'] > 50:
+        feedback.append("Large timing differences detected. Practice maintaining consistent speed throughout the drill.")
+
+    # Drill completion feedback
+    if not completion['missing_cones']:
+        feedback.append("Great job! You interacted with all cones as in the coach's drill.")
+    else:
+        feedback.append(f"Missed cones: {completion['missing_cones']}. Ensure you navigate all cones as shown.")
+    if completion['ball_interaction']:
+        feedback.append("Good ball control: You successfully interacted with the ball.")
+    else:
+        feedback.append("No ball interaction detected. Ensure you engage with the ball as in the coach's drill.")
+
+    # Ball control feedback (sessions analysed before ball analytics have no 'ball_control')
+    ball = movement_analysis.get('ball_control')
+    if ball and ball['baseline']['touches'] > 0:
+        if ball['missed_touches'] > 0 and ball['touch_count_diff'] < 0:
+            feedback.append(f"Fewer ball touches than the coach ({ball['player']['touches']} vs {ball['baseline']['touches']}). Keep the ball closer with more frequent touches between cones.")
+        elif ball['touch_count_diff'] > ball['baseline']['touches'] * 0.25:
+            feedback.append(f"More ball touches than the coach ({ball['player']['touches']} vs {ball['baseline']['touches']}). Aim for cleaner, more purposeful touches.")
+        if ball['avg_touch_timing_offset'] > 5:
+            feedback.append(f"Touch timing: your touches land ~{ball['avg_touch_timing_offset']:.0f} frames away from the coach's. Work on your rhythm around the cones.")
+        if 0 < ball['speed_ratio'] < 0.8:
+            feedback.append("Ball speed is lower than the coach's. Push the ball further ahead between cones.")
+        elif ball['speed_ratio'] > 1.25:
+            feedback.append("The ball is travelling faster than in the coach's drill. Use softer touches to keep it under control.")
+
+    return feedback
+
+def load_timelines(alignment, series_path):
+    """
+    Per-frame series for the dashboard: left/right leg angle differences saved by step3
+    (if series_path exists) and the signed DTW frame offset (baseline - player) per aligned pair.
+    Returns: Dict {name: 1-D array}.
+    """
+    timelines = {}
+    if series_path is not None and os.path.exists(series_path):
+        with np.load(series_path) as series:
+            timelines['Left leg angle diff'] = series['left_leg']
+            timelines['Right leg angle diff'] = series['right_leg']
+    if len(alignment):
+        timelines['DTW frame offset'] = np.concatenate([b - p for b, p in alignment.iter_runs()])
+    return timelines
+
+def create_dashboard(movement_analysis, output_html, timelines=None):
+    """
+    Write a self-contained dashboard (chart runtime embedded, works offline).
+    timelines: Optional dict {name: per-frame array}; an LTTB overview is embedded in the page and
+    full-resolution chunks are written next to it and loaded on zoom (see dashboard_runtime).
+    """
+    timeline_data = write_timelines(timelines, output_html) if timelines else None
+    timeline_section = """
+            <h2>Per-Frame Timelines</h2>
+            <p>Drag across a chart to zoom in (full-resolution data loads on demand); double-click to reset.</p>
+            <canvas id="angleTimeline" width="800" height="300"></canvas>
+            <canvas id="offsetTimeline" width="800" height="300"></canvas>""" if timeline_data else ""
+    timeline_script = f"""
+            DrillDashboard.timelines({json.dumps(timeline_data)}, [
+                {{canvas: 'angleTimeline', series: ['Left leg angle diff', 'Right leg angle diff'],
+                  colors: ['#36A2EB', '#FF6384'], yLabel: 'Degrees'}},
+                {{canvas: 'offsetTimeline', series: ['DTW frame offset'], colors: ['#9966FF'], yLabel: 'Frames'}}
+            ]);""" if timeline_data else ""
+
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Football Drill Performance Dashboard</title>
+        <script>{CHART_RUNTIME}</script>
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 20px; }}
+            h1 {{ text-align: center; }}
+            .container {{ max-width: 800px; margin: auto; }}
+            canvas {{ margin: 20px 0; width: 100%; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>Football Drill Performance Dashboard</h1>
+            <h2>Form Accuracy</h2>
+            <canvas id="formChart" width="800" height="300"></canvas>
+            <h2>Timing Consistency</h2>
+            <canvas id="timingChart" width="800" height="300"></canvas>{timeline_section}
+            <h2>Drill Completion</h2>
+            <p>Completed Cones: {movement_analysis['drill_completion']['completed_cones']}</p>
+            <p>Missing Cones: {movement_analysis['drill_completion']['missing_cones']}</p>
+            <p>Ball Interaction: {'Yes' if movement_analysis['drill_completion']['ball_interaction'] else 'No'}</p>
+            <h2>Feedback</h2>
+            <ul>
+                {"".join(f"<li>{f}</li>" for f in generate_textual_feedback(movement_analysis))}
+            </ul>
+        </div>
+        <script>
+            DrillDashboard.barChart(document.getElementById('formChart'),
+                ['Left Leg', 'Right Leg', 'Overall'],
+                [{movement_analysis['form_accuracy']['left_leg_angle_diff']},
+                 {movement_analysis['form_accuracy']['right_leg_angle_diff']},
+                 {movement_analysis['form_accuracy']['overall_angle_diff']}],
+                ['#36A2EB', '#FF6384', '#FFCE56'], '\u00b0');
+            DrillDashboard.barChart(document.getElementById('timingChart'),
+                ['Avg Frame Offset', 'DTW Distance'],
+                [{movement_analysis['timing_consistency']['avg_frame_offset']},
+                 {movement_analysis['timing_consistency']['dtw_distance']}],
+                ['#4BC0C0', '#9966FF'], '');{timeline_script}
+        </script>
+    </body>
+    </html>
+    """
+    with open(output_html, 'w') as f:
+        f.write(html_content)
+    print(f"Dashboard saved to {output_html}")
+
+def main(baseline_video, player_video, alignment_path, movement_json, output_video, output_json, output_html,
+         store_path='sessions.db', series_path='movement_series.npz',
+         baseline_json='baseline_data.json', player_json='player_data.json'):
+    # Load data
+    alignment = load_alignment(alignment_path)
+    movement_analysis = load_json_data(movement_json)
+
+    # Create ghost overlay video
+    create_ghost_overlay(baseline_video, player_video, alignment, output_video, baseline_json, player_json)
+
+    # Generate textual feedback
+    feedback = generate_textual_feedback(movement_analysis)
+    with open(output_json, 'w') as f:
+        json.dump({'feedback': feedback}, f, indent=4)
+    print(f"Textual feedback saved to {output_json}")
+    if store_path is not None and 'session_id' in movement_analysis:
+        with SessionStore(store_path) as store:
+            store.record_feedback(movement_analysis['session_id'], feedback)
+
+    # Create performance dashboard
+    create_dashboard(movement_analysis, output_html, load_timelines(alignment, series_path))
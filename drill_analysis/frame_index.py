@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# OpenCV is imported inside the functions that decode, so reading index metadata
+# (video_properties, FrameIndex) does not load it
+
+def cache_index_dir(video_path):
+    """
+    Per-user cache location of a video's index, used when the video's own directory is read-only:
+    $DRILL_ANALYSIS_CACHE (default ~/.cache/drill_analysis)/<name>-<path hash>.index.
+    """
+    key = hashlib.sha1(os.path.abspath(video_path).encode('utf-8')).hexdigest()[:16]
+    base = os.environ.get('DRILL_ANALYSIS_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'drill_analysis'))
+    return os.path.join(base, f"{os.path.basename(video_path)}-{key}.index")
+
+def index_dir_for(video_path):
+    """
+    Directory holding the persisted index of a video: '<video_path>.index' next to the video, or
+    cache_index_dir(video_path) when that does not exist and the video's directory is not writable.
+    """
+    local = f"{video_path}.index"
+    if os.path.isdir(local) or os.access(os.path.dirname(os.path.abspath(video_path)), os.W_OK):
+        return local
+    return cache_index_dir(video_path)
+
+def is_keyframe(cap):
+    """Whether the frame last grabbed from cap is a keyframe, or None if the backend cannot tell."""
+    import cv2
+    # Last-raw-frame keyframe flag (OpenCV >= 4.7, FFmpeg backend); missing on older builds
+    prop = getattr(cv2, 'CAP_PROP_LRF_HAS_KEY_FRAME', None)
+    if prop is None:
+        return None
+    value = cap.get(prop)
+    return None if value < 0 else value > 0
+
+class FrameIndexWriter:
+    """
+    Builds a frame index during an existing decode pass (step_1 extraction):
+    per-frame timestamps, a keyframe table and a sparse low-resolution thumbnail strip
+    appended to a raw uint8 file that is memory-mapped on load.
+    thumb_interval: Store a thumbnail every this many frames (default: one per second of video,
+    ~150 MB per 90 minutes at 160 px); 1 keeps full-rate thumbnails, at ~43 KB per 16:9 frame.
+    """
+
+    def __init__(self, video_path, frame_width, frame_height, fps, thumb_width=160, keyframe_interval=None,
+                 thumb_interval=None):
+        self.video_path = video_path
+        self.index_dir = index_dir_for(video_path)
+        os.makedirs(self.index_dir, exist_ok=True)
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.fps = fps
+        self.thumb_width = thumb_width
+        self.thumb_height = max(1, round(frame_height * thumb_width / frame_width)) if thumb_width else 0
+        # Seek anchors used when the backend does not report keyframes
+        self.keyframe_interval = keyframe_interval or max(1, int(round(fps or 30)))
+        self.thumb_interval = thumb_interval or max(1, int(round(fps or 30)))
+        self.timestamps = []
+        self.keyframes = []
+        self.flags_seen = False
+        self.thumb_file = open(os.path.join(self.index_dir, 'thumbs.u8'), 'wb') if thumb_width else None
+        self.thumb = np.empty((self.thumb_height, self.thumb_width, 3), dtype=np.uint8) if thumb_width else None
+
+    def add(self, frame, timestamp_ms, keyframe=None):
+        """Record the next decoded frame. keyframe: flag from is_keyframe(cap), or None if unknown."""
+        frame_idx = len(self.timestamps)
+        self.timestamps.append(timestamp_ms)
+        if keyframe is not None:
+            self.flags_seen = True
+            if keyframe:
+                self.keyframes.append(frame_idx)
+        if self.thumb_file is not None and frame_idx % self.thumb_interval == 0:
+            import cv2
+            cv2.resize(frame, (self.thumb_width, self.thumb_height), dst=self.thumb, interpolation=cv2.INTER_AREA)
+            self.thumb_file.write(self.thumb.tobytes())
+
+    def close(self):
+        if self.thumb_file is not None:
+            self.thumb_file.close()
+        num_frames = len(self.timestamps)
+        keyframes = self.keyframes if self.flags_seen else list(range(0, num_frames, self.keyframe_interval))
+        if num_frames and (not keyframes or keyframes[0] != 0):
+            keyframes = [0] + keyframes
+        np.save(os.path.join(self.index_dir, 'timestamps.npy'), np.asarray(self.timestamps, dtype=np.float64))
+        np.save(os.path.join(self.index_dir, 'keyframes.npy'), np.asarray(keyframes, dtype=np.int64))
+        stat = os.stat(self.video_path)
+        meta = {
+            'num_frames': num_frames,
+            'frame_width': self.frame_width,
+            'frame_height': self.frame_height,
+            'fps': self.fps,
+            'thumb_width': self.thumb_width,
+            'thumb_height': self.thumb_height,
+            'thumb_interval': self.thumb_interval,
+            'keyframes_from_stream': self.flags_seen,
+            'source_size': stat.st_size,
+            'source_mtime': stat.st_mtime
+        }
+        with open(os.path.join(self.index_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=4)
+
+class FrameIndex:
+    """Loaded frame index: timestamps, keyframe table and memory-mapped (sparse) thumbnails."""
+
+    def __init__(self, video_path):
+        self.video_path = video_path
+        self.index_dir = index_dir_for(video_path)
+        with open(os.path.join(self.index_dir, 'meta.json'), 'r') as f:
+            self.meta = json.load(f)
+        self.num_frames = self.meta['num_frames']
+        self.timestamps = np.load(os.path.join(self.index_dir, 'timestamps.npy'), mmap_mode='r')
+        self.keyframes = np.load(os.path.join(self.index_dir, 'keyframes.npy'))
+        self.thumbs = None
+        self.thumb_interval = self.meta.get('thumb_interval', 1)  # indexes written before sparse strips
+        thumb_path = os.path.join(self.index_dir, 'thumbs.u8')
+        if self.meta['thumb_width'] and self.num_frames and os.path.exists(thumb_path):
+            num_thumbs = -(-self.num_frames // self.thumb_interval)
+            self.thumbs = np.memmap(thumb_path, dtype=np.uint8, mode='r',
+                                    shape=(num_thumbs, self.meta['thumb_height'], self.meta['thumb_width'], 3))
+
+    def is_stale(self):
+        """True if the source video changed since the index was built."""
+        stat = os.stat(self.video_path)
+        return stat.st_size != self.meta['source_size'] or stat.st_mtime != self.meta['source_mtime']
+
+    def nearest_keyframe(self, frame_idx):
+        """Last keyframe at or before frame_idx."""
+        pos = np.searchsorted(self.keyframes, frame_idx, side='right') - 1
+        return int(self.keyframes[max(pos, 0)])
+
+    def frame_at_time(self, timestamp_ms):
+        """Index of the frame whose timestamp is closest to timestamp_ms."""
+        pos = int(np.searchsorted(self.timestamps, timestamp_ms))
+        if pos >= self.num_frames:
+            return self.num_frames - 1
+        if pos > 0 and timestamp_ms - self.timestamps[pos - 1] < self.timestamps[pos] - timestamp_ms:
+            return pos - 1
+        return pos
+
+    def thumbnail_frame(self, frame_idx):
+        """Frame the thumbnail served for frame_idx was taken from (the last stored one at or before it)."""
+        return frame_idx // self.thumb_interval * self.thumb_interval
+
+    def thumbnail(self, frame_idx):
+        """
+        Low-resolution BGR thumbnail for frame_idx, served from the memory map without decoding.
+        With a sparse strip this is the thumbnail of thumbnail_frame(frame_idx).
+        """
+        if self.thumbs is None:
+            raise ValueError("Index was built without thumbnails")
+        if frame_idx < 0 or frame_idx >= self.num_frames:
+            raise IndexError(f"Frame {frame_idx} out of range")
+        return self.thumbs[frame_idx // self.thumb_interval]
+
+def build_frame_index(video_path, thumb_width=160, thumb_interval=None):
+    """Build the index with a standalone decode pass (step_1 builds it during extraction instead)."""
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Error opening video file {video_path}")
+    writer = FrameIndexWriter(video_path, int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                              int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), cap.get(cv2.CAP_PROP_FPS), thumb_width,
+                              thumb_interval=thumb_interval)
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        writer.add(frame, cap.get(cv2.CAP_PROP_POS_MSEC), is_keyframe(cap))
+    cap.release()
+    writer.close()
+    return FrameIndex(video_path)
+
+def load_or_build_frame_index(video_path, thumb_width=160, thumb_interval=None):
+    """Load the persisted index, rebuilding it if it is missing or the video changed."""
+    if os.path.exists(os.path.join(index_dir_for(video_path), 'meta.json')):
+        index = FrameIndex(video_path)
+        if not index.is_stale():
+            return index
+    return build_frame_index(video_path, thumb_width, thumb_interval)
+
+def video_properties(video_path, open_video=True):
+    """
+    (frame_width, frame_height, fps) of a video, from its persisted index when available
+    so no decoder has to be opened.
+    open_video: If False, only the index is consulted and None is returned when there is none.
+    """
+    meta_path = os.path.join(index_dir_for(video_path), 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        return meta['frame_width'], meta['frame_height'], meta['fps']
+    if not open_video:
+        return None
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Error opening video file {video_path}")
+    props = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), cap.get(cv2.CAP_PROP_FPS))
+    cap.release()
+    return props
+
+class FrameReader:
+    """
+    Frame-accurate random access using a FrameIndex.
+    Sequential and short forward requests just keep decoding; anything else seeks to the
+    nearest keyframe at or before the target and decodes forward, so each fetch decodes at
+    most one GOP. The landing frame after a seek is identified from its timestamp, so an
+    imprecise container seek cannot shift the returned frame.
+    """
+
+    def __init__(self, video_path, index=None):
+        import cv2
+        self.index = index if index is not None else load_or_build_frame_index(video_path)
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise IOError(f"Error opening video file {video_path}")
+        self.next_frame = 0  # index of the frame the next grab() returns
+        self.decoded = 0  # frames decoded, for reporting
+
+    def _grab(self):
+        if not self.cap.grab():
+            return False
+        self.decoded += 1
+        self.next_frame += 1
+        return True
+
+    def _seek(self, target):
+        import cv2
+        keyframe = self.index.nearest_keyframe(target)
+        for _ in range(3):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            if not self.cap.grab():
+                return False
+            self.decoded += 1
+            landed = self.index.frame_at_time(self.cap.get(cv2.CAP_PROP_POS_MSEC))
+            self.next_frame = landed + 1
+            if landed <= target:
+                return True
+            # Overshot: fall back to the previous keyframe
+            keyframe = self.index.nearest_keyframe(keyframe - 1) if keyframe > 0 else 0
+        return False
+
+    def read(self, frame_idx, image=None):
+        """
+        Decode frame frame_idx. image: optional preallocated BGR buffer to decode into.
+        Returns: (ret, image) like cv2.VideoCapture.read.
+        """
+        if frame_idx < 0 or frame_idx >= self.index.num_frames:
+            return False, None
+        current = self.next_frame - 1  # frame held by the decoder after the last grab
+        if frame_idx != current:
+            gap = frame_idx - self.next_frame
+            # Decoding forward is cheaper than a seek while the target is within the current GOP
+            if gap < 0 or self.index.nearest_keyframe(frame_idx) > self.next_frame:
+                if not self._seek(frame_idx):
+                    return False, None
+            while self.next_frame <= frame_idx:
+                if not self._grab():
+                    return False, None
+        return self.cap.retrieve(image)
+
+    def thumbnail(self, frame_idx):
+        return self.index.thumbnail(frame_idx)
+
+    def release(self):
+        self.cap.release()
@@ -0,0 +1,175 @@
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+class FrameBufferPool:
+    """
+    Named, preallocated frame buffers for the per-frame render loops.
+    A buffer is only (re)allocated when a name is first requested or its shape changes,
+    so steady-state loops run without any frame-sized allocations.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8, zero=False):
+        buf = self.buffers.get(name)
+        if buf is None or buf.shape != tuple(shape) or buf.dtype != dtype:
+            buf = np.zeros(shape, dtype=dtype) if zero else np.empty(shape, dtype=dtype)
+            self.buffers[name] = buf
+            self.allocations += 1
+        return buf
+
+def to_rgb(frame, pool, name='rgb'):
+    """BGR -> RGB conversion into a pooled buffer (cv2 dst= output, no new array per frame)."""
+    rgb = pool.get(name, frame.shape, frame.dtype)
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+    return rgb
+
+def draw_skeleton(canvas, keypoints, connections, color, frame_width, frame_height,
+                  radius=5, thickness=2, min_visibility=0.5):
+    """
+    Draw landmarks and connections onto the canvas in place.
+    keypoints: Dict {str(landmark_idx): {'x', 'y', 'visibility'}} with normalized coordinates.
+    Returns: Dirty rectangle (x1, y1, x2, y2) covering everything drawn, or None if nothing was drawn.
+    """
+    points = {}
+    for idx, kp in keypoints.items():
+        if kp['visibility'] < min_visibility:  # Skip low-visibility keypoints
+            continue
+        points[str(idx)] = (int(kp['x'] * frame_width), int(kp['y'] * frame_height))
+    if not points:
+        return None
+
+    for x, y in points.values():
+        cv2.circle(canvas, (x, y), radius, color, -1)
+    for start_idx, end_idx in connections:
+        start_kp = keypoints.get(str(start_idx))
+        end_kp = keypoints.get(str(end_idx))
+        if start_kp is None or end_kp is None:
+            continue
+        if start_kp['visibility'] > min_visibility and end_kp['visibility'] > min_visibility:
+            cv2.line(canvas, points[str(start_idx)], points[str(end_idx)], color, thickness)
+
+    xs = [x for x, _ in points.values()]
+    ys = [y for _, y in points.values()]
+    pad = max(radius, thickness) + 1
+    x1, y1 = max(min(xs) - pad, 0), max(min(ys) - pad, 0)
+    x2, y2 = min(max(xs) + pad + 1, canvas.shape[1]), min(max(ys) + pad + 1, canvas.shape[0])
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return x1, y1, x2, y2
+
+def blend_region(dst, src, alpha, rect):
+    """
+    dst = alpha * src + (1 - alpha) * dst, written in place for the pixels src has drawn on (nonzero)
+    inside rect, then src[rect] is cleared so the canvas is blank for the next frame.
+    The rest of dst is left unchanged, and only the dirty rectangle is touched.
+    """
+    if rect is None:
+        return
+    x1, y1, x2, y2 = rect
+    dst_roi = dst[y1:y2, x1:x2]
+    src_roi = src[y1:y2, x1:x2]
+    drawn = src_roi.any(axis=2)
+    if drawn.any():
+        dst_roi[drawn] = cv2.addWeighted(src_roi[drawn], alpha, dst_roi[drawn], 1 - alpha, 0)
+    src_roi[:] = 0
+
+def render_ghost_frame(player_frame, coach_canvas, coach_keypoints, player_keypoints, connections, alpha=0.4):
+    """
+    Render the ghost overlay into player_frame in place: the coach skeleton (blue) is drawn on the
+    blank pooled canvas and blended onto the pixels it covers, then the player skeleton (red) is drawn on top.
+    """
+    frame_height, frame_width = player_frame.shape[:2]
+    if coach_keypoints:
+        rect = draw_skeleton(coach_canvas, coach_keypoints, connections, (255, 0, 0), frame_width, frame_height)
+        blend_region(player_frame, coach_canvas, alpha, rect)
+    if player_keypoints:
+        draw_skeleton(player_frame, player_keypoints, connections, (0, 0, 255), frame_width, frame_height)
+    return player_frame
+
+def _render_ghost_frame_unpooled(player_frame, coach_keypoints, player_keypoints, connections, alpha=0.4):
+    # Previous render path: full-frame copy, fresh canvas and a new blended frame every pair
+    frame_height, frame_width = player_frame.shape[:2]
+    overlay = player_frame.copy()
+    coach_skeleton = np.zeros_like(overlay)
+    draw_skeleton(coach_skeleton, coach_keypoints, connections, (255, 0, 0), frame_width, frame_height)
+    overlay = cv2.addWeighted(coach_skeleton, alpha, overlay, 1 - alpha, 0)
+    draw_skeleton(overlay, player_keypoints, connections, (0, 0, 255), frame_width, frame_height)
+    return overlay
+
+# Lower-body and torso connections of the MediaPipe pose graph, used for synthetic benchmark skeletons
+_BENCH_CONNECTIONS = [(11, 12), (11, 23), (12, 24), (23, 24), (23, 25), (25, 27), (24, 26), (26, 28),
+                      (27, 29), (29, 31), (28, 30), (30, 32)]
+
+def _synthetic_keypoints(rng, centre_x):
+    keypoints = {}
+    for idx in range(33):
+        keypoints[str(idx)] = {'x': float(centre_x + rng.normal(0, 0.03)),
+                               'y': float(0.3 + idx / 33 * 0.5 + rng.normal(0, 0.01)),
+                               'z': 0.0, 'visibility': 0.9}
+    return keypoints
+
+def benchmark_render_loop(resolutions=((1920, 1080), (3840, 2160)), num_frames=60, seed=0):
+    """
+    Compare the unpooled and pooled per-frame loops (BGR->RGB conversion from step_1 plus the
+    ghost overlay from step_4) on synthetic frames.
+    Transient bytes are the tracemalloc peak above the loop's baseline for each frame, so
+    frame_buffers_per_frame is the peak number of frame-sized temporaries one iteration holds.
+    Returns: Dict {'WxH': {'unpooled': {...}, 'pooled': {...}}}.
+    """
+    rng = np.random.default_rng(seed)
+    report = {}
+    for width, height in resolutions:
+        source = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        coach_kps = _synthetic_keypoints(rng, 0.45)
+        player_kps = _synthetic_keypoints(rng, 0.55)
+        frame_bytes = source.nbytes
+        results = {}
+
+        def unpooled_iteration():
+            frame = source.copy()  # stands in for the decoder's new frame
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            return _render_ghost_frame_unpooled(frame, coach_kps, player_kps, _BENCH_CONNECTIONS)
+
+        pool = FrameBufferPool()
+
+        def pooled_iteration():
+            frame = pool.get('frame', source.shape)
+            np.copyto(frame, source)  # stands in for cap.read(frame) into the pooled buffer
+            to_rgb(frame, pool)
+            canvas = pool.get('coach_skeleton', source.shape, zero=True)
+            return render_ghost_frame(frame, canvas, coach_kps, player_kps, _BENCH_CONNECTIONS)
+
+        for mode, iteration in (('unpooled', unpooled_iteration), ('pooled', pooled_iteration)):
+            iteration()  # warm-up (pool fill)
+            start = time.perf_counter()
+            for _ in range(num_frames):
+                iteration()
+            elapsed = time.perf_counter() - start
+
+            # Separate pass so tracing overhead does not skew the throughput numbers
+            tracemalloc.start()
+            transient = []
+            for _ in range(min(num_frames, 10)):
+                base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                iteration()
+                transient.append(tracemalloc.get_traced_memory()[1] - base)
+            tracemalloc.stop()
+            results[mode] = {
+                'fps': num_frames / elapsed if elapsed > 0 else 0.0,
+                'transient_mb_per_frame': float(np.mean(transient)) / 1e6,
+                'frame_buffers_per_frame': float(np.mean(transient)) / frame_bytes
+            }
+        results['pooled']['pool_allocations'] = pool.allocations
+        report[f'{width}x{height}'] = results
+
+        for mode, stats in results.items():
+            print(f"{width}x{height} {mode}: {stats['fps']:.1f} fps, "
+                  f"{stats['transient_mb_per_frame']:.1f} MB transient/frame "
+                  f"(~{stats['frame_buffers_per_frame']:.1f} frame buffers)")
+    return report
@@ -0,0 +1,202 @@
+import json
+import numpy as np
+from math import atan2, degrees
+from .alignment import check_single_person
+from .alignment_path import load_alignment
+from .session_store import SessionStore, session_fingerprint
+from .ball_analytics import compare_ball_control
+from .frame_index import video_properties
+from .plotting import save_line_plot
+
+def load_json_data(json_path):
+    with open(json_path, 'r') as f:
+        return json.load(f)
+
+def calculate_angle(p1, p2, p3):
+    """
+    Calculate angle (in degrees) between three points (p1-p2-p3).
+    p1, p2, p3: Dict with 'x', 'y' coordinates (normalized).
+    """
+    v1 = np.array([p1['x'] - p2['x'], p1['y'] - p2['y']])
+    v2 = np.array([p3['x'] - p2['x'], p3['y'] - p2['y']])
+    dot_product = np.dot(v1, v2)
+    norms = np.linalg.norm(v1) * np.linalg.norm(v2)
+    if norms == 0:
+        return 0.0
+    angle = np.arccos(dot_product / norms)
+    return degrees(angle)
+
+def compute_joint_angles(keypoints, joint_triplets):
+    """
+    Compute angles for specified joint triplets (e.g., hip-knee-ankle).
+    joint_triplets: List of [id1, id2, id3] (e.g., [23, 25, 27] for left_hip-knee-ankle).
+    Returns: Dict of angles {triplet_idx: angle}.
+    """
+    angles = {}
+    for idx, (id1, id2, id3) in enumerate(joint_triplets):
+        if str(id1) in keypoints and str(id2) in keypoints and str(id3) in keypoints:
+            p1, p2, p3 = keypoints[str(id1)], keypoints[str(id2)], keypoints[str(id3)]
+            if p1['visibility'] > 0.5 and p2['visibility'] > 0.5 and p3['visibility'] > 0.5:
+                angles[idx] = calculate_angle(p1, p2, p3)
+            else:
+                angles[idx] = 0.0  # Handle low-visibility keypoints
+        else:
+            angles[idx] = 0.0
+    return angles
+
+def check_drill_completion(baseline_objects, player_objects, alignment):
+    """
+    Check if player interacted with all cones and ball as in baseline.
+    Returns: List of completed actions and missing actions.
+    """
+    baseline_cone_ids = set()
+    player_cone_ids = set()
+    ball_interaction = {'baseline': False, 'player': False}
+
+    for frame in baseline_objects:
+        for obj in frame['objects']:
+            if obj['class'] == 'cone':
+                baseline_cone_ids.add(obj['track_id'])
+            if obj['class'] == 'ball':
+                ball_interaction['baseline'] = True
+
+    for frame in player_objects:
+        for obj in frame['objects']:
+            if obj['class'] == 'cone':
+                player_cone_ids.add(obj['track_id'])
+            if obj['class'] == 'ball':
+                ball_interaction['player'] = True
+
+    completed_cones = baseline_cone_ids.intersection(player_cone_ids)
+    missing_cones = baseline_cone_ids - player_cone_ids
+    ball_completed = ball_interaction['baseline'] == ball_interaction['player']
+
+    return {
+        'completed_cones': list(completed_cones),
+        'missing_cones': list(missing_cones),
+        'ball_interaction': ball_completed
+    }
+
+def session_video_properties(frame_data, video_path):
+    """
+    (frame_width, frame_height, fps) of the video a session was extracted from: recorded by step_1
+    in the first frame record, else read from the video's frame index. The video itself is never
+    opened, so analysis needs neither the source files nor OpenCV.
+    Returns: Tuple, or None if neither source is available.
+    """
+    video = frame_data[0].get('video') if frame_data else None
+    if video:
+        return video['frame_width'], video['frame_height'], video['fps']
+    return video_properties(video_path, open_video=False)
+
+def main(baseline_json, player_json, alignment_path, output_json,
+         player='player', drill='cone_dribble', session_date=None, store_path='sessions.db',
+         series_path='movement_series.npz', baseline_video='benchmark-sample.mp4',
+         player_video='practise-sample1.mp4', plot_path='angle_differences.png'):
+    """
+    player, drill, session_date: Keys under which the session is recorded in the session history
+    store at store_path (see session_store); session_date defaults to today. Pass store_path=None
+    to skip recording.
+    series_path: Where the per-pair left/right angle differences are saved for the step_4 dashboard.
+    baseline_video, player_video: Source videos, used only for their frame size and fps when the step_1
+    output does not record them (see session_video_properties) so ball positions and speeds can be
+    compared with the keypoints. Without either, the ball control section is skipped.
+    plot_path: Where to save the angle difference plot (None skips plotting).
+    """
+    # Load data
+    baseline_data = load_json_data(baseline_json)
+    player_data = load_json_data(player_json)
+    check_single_person(baseline_data)
+    check_single_person(player_data)
+    alignment = load_alignment(alignment_path)
+
+    # Define joint triplets for angle calculation (hip-knee-ankle for both legs)
+    joint_triplets = [
+        [23, 25, 27],  # left_hip-knee-ankle
+        [24, 26, 28]   # right_hip-knee-ankle
+    ]
+
+    # Compute angles for aligned frames
+    angle_diffs = []
+    for b_frame, p_frame in alignment.iter_pairs():
+        if b_frame < len(baseline_data) and p_frame < len(player_data):
+            b_keypoints = baseline_data[b_frame]['player_keypoints']
+            p_keypoints = player_data[p_frame]['player_keypoints']
+            
+            b_angles = compute_joint_angles(b_keypoints, joint_triplets)
+            p_angles = compute_joint_angles(p_keypoints, joint_triplets)
+            
+            # Calculate angle differences
+            frame_diff = []
+            for idx in b_angles:
+                diff = abs(b_angles[idx] - p_angles[idx])
+                frame_diff.append(diff)
+            angle_diffs.append(frame_diff)
+
+    # Compute form accuracy (average angle difference)
+    angle_diffs = np.array(angle_diffs)
+    form_accuracy = {
+        'left_leg': float(np.mean(angle_diffs[:, 0])) if len(angle_diffs) > 0 else 0.0,
+        'right_leg': float(np.mean(angle_diffs[:, 1])) if len(angle_diffs) > 0 else 0.0
+    }
+    overall_form_accuracy = float(np.mean(angle_diffs)) if len(angle_diffs) > 0 else 0.0
+
+    # Timing consistency (use DTW distance and frame offsets)
+    timing_consistency = {
+        'avg_frame_offset': float(alignment.mean_abs_offset()),
+        'dtw_distance': float(alignment.dtw_distance)
+    }
+
+    # Drill completion
+    drill_completion = check_drill_completion(baseline_data, player_data, alignment)
+
+    # Ball control: kinematics and touches of both sessions, compared through the alignment
+    baseline_props = session_video_properties(baseline_data, baseline_video)
+    player_props = session_video_properties(player_data, player_video)
+    if baseline_props and player_props:
+        ball_control = compare_ball_control(baseline_data, player_data, alignment,
+                                            baseline_props[:2], player_props[:2], baseline_props[2], player_props[2])
+    else:
+        ball_control = None
+        print("Ball control skipped: frame size and fps are not recorded in the step_1 output and "
+              "no frame index was found for the videos (re-run extract)")
+
+    # Save results
+    results = {
+        'form_accuracy': {
+            'left_leg_angle_diff': form_accuracy['left_leg'],
+            'right_leg_angle_diff': form_accuracy['right_leg'],
+            'overall_angle_diff': overall_form_accuracy
+        },
+        'timing_consistency': timing_consistency,
+        'drill_completion': drill_completion
+    }
+    if ball_control is not None:
+        results['ball_control'] = ball_control
+
+    # Record the session in the history store; step_4 attaches its feedback via session_id
+    if store_path is not None:
+        with SessionStore(store_path) as store:
+            results['session_id'] = store.record_analysis(
+                results, angle_diffs, player, drill, session_date,
+                fingerprint=session_fingerprint(baseline_json, player_json))
+        print(f"Session {results['session_id']} recorded in {store_path}")
+
+    with open(output_json, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Analysis results saved to {output_json}")
+
+    # Per-pair angle differences for the dashboard timelines
+    if series_path is not None:
+        angle_series = angle_diffs.reshape(-1, 2).astype(np.float32)
+        with open(series_path, 'wb') as f:
+            np.savez(f, left_leg=angle_series[:, 0], right_leg=angle_series[:, 1])
+        print(f"Angle difference series saved to {series_path}")
+
+    # Visualize angle differences
+    if not plot_path:
+        return
+    save_line_plot(plot_path, [(None, angle_diffs[:, 0], {'label': 'Left Leg Angle Diff', 'color': 'blue'}),
+                               (None, angle_diffs[:, 1], {'label': 'Right Leg Angle Diff', 'color': 'red'})],
+                   'Aligned Frame Pair', 'Angle Difference (degrees)', 'Joint Angle Differences')
+    print(f"Angle differences plot saved to {plot_path}")
@@ -0,0 +1,28 @@
+"""
+Static PNG plots written by the pipeline steps.
+"""
+
+def save_line_plot(plot_path, lines, xlabel, ylabel, title, figsize=(10, 5)):
+    """
+    Draw one or more line series on a single axis and save the figure.
+    lines: List of (x, y, style) tuples; x may be None to plot against the sample index, and style is a
+    dict of Axes.plot keyword arguments. A legend is drawn when any style has a 'label'.
+    """
+    # A standalone Agg figure, so plotting never touches pyplot state or the caller's backend
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for x, y, style in lines:
+        if x is None:
+            ax.plot(y, **style)
+        else:
+            ax.plot(x, y, **style)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    if any('label' in style for _, _, style in lines):
+        ax.legend()
+    ax.grid(True)
+    fig.savefig(plot_path)
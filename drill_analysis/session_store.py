@@ -0,0 +1,221 @@
+import datetime
+import hashlib
+import json
+import sqlite3
+import numpy as np
+
+# Summary metrics stored per session; lower is better for all of them
+METRICS = ('left_leg_angle_diff', 'right_leg_angle_diff', 'overall_angle_diff', 'avg_frame_offset', 'dtw_distance')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    drill TEXT NOT NULL,
+    session_date TEXT NOT NULL,
+    left_leg_angle_diff REAL,
+    right_leg_angle_diff REAL,
+    overall_angle_diff REAL,
+    avg_frame_offset REAL,
+    dtw_distance REAL,
+    completed_cones INTEGER,
+    missing_cones INTEGER,
+    ball_interaction INTEGER,
+    feedback TEXT,
+    created_at TEXT NOT NULL,
+    fingerprint TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_player_drill_date ON sessions (player, drill, session_date);
+CREATE INDEX IF NOT EXISTS idx_sessions_drill_date ON sessions (drill, session_date);
+CREATE TABLE IF NOT EXISTS angle_series (
+    session_id INTEGER PRIMARY KEY REFERENCES sessions (id) ON DELETE CASCADE,
+    source_length INTEGER NOT NULL,
+    left_leg BLOB NOT NULL,
+    right_leg BLOB NOT NULL
+);
+"""
+
+# Created after the fingerprint column is ensured, since older databases lack it
+IDENTITY_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_identity ON sessions (player, drill, session_date, fingerprint);
+"""
+
+def session_fingerprint(*paths):
+    """
+    Content hash of a session's input files (e.g. the baseline and player step_1 JSON), so
+    re-analysing the same recording updates its session instead of adding a new one.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def downsample_series(values, max_points=500):
+    """
+    Bucket-average a 1-D series down to at most max_points values.
+    Returns: np.float32 array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= max_points:
+        return values.astype(np.float32)
+    edges = np.linspace(0, len(values), max_points + 1).astype(np.int64)[:-1]
+    sums = np.add.reduceat(values, edges)
+    counts = np.diff(np.append(edges, len(values)))
+    return (sums / counts).astype(np.float32)
+
+def _check_metric(metric):
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}; expected one of {METRICS}")
+
+def _as_date(value):
+    """
+    Normalize a date to 'YYYY-MM-DD' so dates compare correctly as text.
+    Raises ValueError for strings that are not ISO dates (e.g. '2026-7-1').
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    try:
+        return datetime.date.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid session date {value!r}; expected an ISO date, YYYY-MM-DD") from None
+
+class SessionStore:
+    """
+    Embedded SQLite history of analysed sessions, keyed by player, drill and date.
+    Holds the per-session summary metrics from movement_analysis.json, the feedback
+    messages and a downsampled per-frame angle-difference series.
+    """
+
+    def __init__(self, db_path='sessions.db'):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(sessions)")]
+        if 'fingerprint' not in columns:
+            self.conn.execute("ALTER TABLE sessions ADD COLUMN fingerprint TEXT")
+        self.conn.executescript(IDENTITY_INDEX)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record_analysis(self, results, angle_diffs, player, drill, session_date=None, max_points=500,
+                        fingerprint=None):
+        """
+        Store one session's movement analysis.
+        results: Dict in the movement_analysis.json layout.
+        angle_diffs: Array of shape (num_aligned_pairs, 2) with left/right leg angle differences.
+        fingerprint: Identity of the recording (see session_fingerprint). A session with the same player,
+        drill, date and fingerprint is updated in place (its feedback is cleared until step_4 records it
+        again), so re-runs do not add duplicates. Without a fingerprint every call adds a session.
+        Returns: The session id.
+        """
+        form = results['form_accuracy']
+        timing = results['timing_consistency']
+        completion = results['drill_completion']
+        session_date = _as_date(session_date) or datetime.date.today().isoformat()
+        with self.conn:
+            session_id = self.conn.execute(
+                "INSERT INTO sessions (player, drill, session_date, left_leg_angle_diff, right_leg_angle_diff, "
+                "overall_angle_diff, avg_frame_offset, dtw_distance, completed_cones, missing_cones, "
+                "ball_interaction, created_at, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (player, drill, session_date, fingerprint) DO UPDATE SET "
+                "left_leg_angle_diff = excluded.left_leg_angle_diff, right_leg_angle_diff = excluded.right_leg_angle_diff, "
+                "overall_angle_diff = excluded.overall_angle_diff, avg_frame_offset = excluded.avg_frame_offset, "
+                "dtw_distance = excluded.dtw_distance, completed_cones = excluded.completed_cones, "
+                "missing_cones = excluded.missing_cones, ball_interaction = excluded.ball_interaction, "
+                "feedback = NULL, created_at = excluded.created_at "
+                "RETURNING id",
+                (player, drill, session_date, form['left_leg_angle_diff'], form['right_leg_angle_diff'],
+                 form['overall_angle_diff'], timing['avg_frame_offset'], timing['dtw_distance'],
+                 len(completion['completed_cones']), len(completion['missing_cones']),
+                 int(bool(completion['ball_interaction'])), datetime.datetime.now().isoformat(timespec='seconds'),
+                 fingerprint)).fetchone()[0]
+            angle_diffs = np.asarray(angle_diffs, dtype=np.float64).reshape(-1, 2)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO angle_series (session_id, source_length, left_leg, right_leg) VALUES (?, ?, ?, ?)",
+                (session_id, len(angle_diffs),
+                 downsample_series(angle_diffs[:, 0], max_points).tobytes(),
+                 downsample_series(angle_diffs[:, 1], max_points).tobytes()))
+        return session_id
+
+    def record_feedback(self, session_id, feedback):
+        with self.conn:
+            self.conn.execute("UPDATE sessions SET feedback = ? WHERE id = ?", (json.dumps(feedback), session_id))
+
+    def session(self, session_id):
+        """Summary row of one session as a dict, or None."""
+        self.conn.row_factory = sqlite3.Row
+        try:
+            row = self.conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        finally:
+            self.conn.row_factory = None
+        if row is None:
+            return None
+        session = dict(row)
+        session['feedback'] = json.loads(session['feedback']) if session['feedback'] else []
+        return session
+
+    def angle_series(self, session_id):
+        """
+        Downsampled per-frame angle differences of a session.
+        Returns: (left_leg, right_leg) np.float32 arrays, or None if the session has no series.
+        """
+        row = self.conn.execute("SELECT left_leg, right_leg FROM angle_series WHERE session_id = ?",
+                                (session_id,)).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32), np.frombuffer(row[1], dtype=np.float32)
+
+    def trend(self, player, metric='overall_angle_diff', drill=None, since=None, until=None):
+        """
+        A player's metric over time, e.g. left-leg angle difference over the last 3 months.
+        Returns: List of (session_date, session_id, value) ordered by date.
+        """
+        _check_metric(metric)
+        query = f"SELECT session_date, id, {metric} FROM sessions WHERE player = ?"
+        params = [player]
+        if drill is not None:
+            query += " AND drill = ?"
+            params.append(drill)
+        if since is not None:
+            query += " AND session_date >= ?"
+            params.append(_as_date(since))
+        if until is not None:
+            query += " AND session_date <= ?"
+            params.append(_as_date(until))
+        query += " ORDER BY session_date, id"
+        return self.conn.execute(query, params).fetchall()
+
+    def leaderboard(self, drill, metric='overall_angle_diff', since=None, until=None, limit=10):
+        """
+        Players ranked by their best (lowest) value of a metric on a drill.
+        Returns: List of (player, best_value, average_value, num_sessions).
+        """
+        _check_metric(metric)
+        query = (f"SELECT player, MIN({metric}) AS best, AVG({metric}), COUNT(*) FROM sessions "
+                 f"WHERE drill = ? AND {metric} IS NOT NULL")
+        params = [drill]
+        if since is not None:
+            query += " AND session_date >= ?"
+            params.append(_as_date(since))
+        if until is not None:
+            query += " AND session_date <= ?"
+            params.append(_as_date(until))
+        query += " GROUP BY player ORDER BY best LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(query, params).fetchall()